@@ -139,7 +139,79 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media is served by media_management.views.ProtectedMediaView after an ownership check.
+# In production let the web server send the bytes:
+#   'nginx'    -> X-Accel-Redirect to MEDIA_ACCEL_PREFIX (an `internal` location aliased to MEDIA_ROOT)
+#   'sendfile' -> X-Sendfile with the absolute path (Apache mod_xsendfile, lighttpd)
+#   None       -> streamed by Django, with Range support
+MEDIA_ACCEL_REDIRECT = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+# Serializers emit signed media URLs valid for between one and two of these windows (seconds).
+MEDIA_SIGNED_URL_TTL = 3600
+
+#MARK: STORAGES
+# Uploaded files are stored once per distinct content (see media_management.storage).
+STORAGES = {
+    'default': {
+        'BACKEND': 'media_management.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+#MARK: IMAGE VARIANTS
+# Renditions generated for every ImageUpload after it is committed.
+IMAGE_VARIANTS = {
+    'thumbnail': {'max_size': 200, 'format': 'WEBP', 'quality': 75},
+    'small': {'max_size': 640, 'format': 'WEBP', 'quality': 80},
+    'medium': {'max_size': 1280, 'format': 'WEBP', 'quality': 82},
+    'large_jpeg': {'max_size': 1280, 'format': 'JPEG', 'quality': 85},
+}
+IMAGE_BATCH_MAX_FILES = 20  # files accepted by one batch upload request
+IMAGE_BATCH_WRITE_WORKERS = 4  # threads writing a batch upload to storage
+MEDIA_PROCESS_POOL_SIZE = 2  # worker processes for variants and avatar normalization
+
+# Avatars are re-encoded after upload: upright, metadata stripped, longest side capped.
+PROFILE_PICTURE_NORMALIZATION = {'max_size': 512, 'format': 'WEBP', 'quality': 80}
+
+#MARK: BACKGROUND JOBS
+BACKGROUND_JOB_WORKERS = 2  # threads running sha.jobs handlers in each web process
+ACCOUNT_DELETION_BATCH_SIZE = 500  # related rows deleted per transaction when purging an account
+INVESTOR_JOB_BATCH_SIZE = 500  # investments per chunk in admin bulk action jobs
+# generate_statements writes <STATEMENTS_ROOT>/<date>/statement-<user id>.html (kept out of MEDIA_ROOT on purpose).
+STATEMENTS_ROOT = os.path.join(BASE_DIR, 'statements')
+RATE_MATRIX_TTL = 300  # seconds a process keeps the quote rate matrix; local catalog edits refresh it at once
+SCENARIO_BOOK_TTL = 600  # seconds a process reuses the open book loaded for scenario simulations
+LEDGER_CHECKPOINT_INTERVAL = 50  # share ledger entries per investment between balance checkpoints
+LEDGER_CHECKPOINT_LAG_DAYS = 2  # checkpoints only cover entries dated at least this many days ago
+
+#MARK: CACHES
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Shared by every worker process; create the table with `manage.py createcachetable`.
+    # A Redis or Memcached cache works just as well here.
+    'idempotency': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'sha_idempotency_cache',
+        'OPTIONS': {
+            # Once over MAX_ENTRIES the backend drops expired rows and then a third of the
+            # rest, live responses and in-flight locks included. Size it above the keys one
+            # IDEMPOTENCY_KEY_TTL collects: one row per keyed write plus its short-lived lock,
+            # i.e. 200k keyed writes a day with room to spare. The default is only 300.
+            'MAX_ENTRIES': 500_000,
+        },
+    },
+}
 
+#MARK: IDEMPOTENCY
+# Responses replayed for retried writes carrying an Idempotency-Key (see sha.idempotency).
+# The alias must be shared between worker processes; a process-local cache fails check sha.W001.
+IDEMPOTENCY_CACHE = 'idempotency'
+IDEMPOTENCY_KEY_TTL = 24 * 60 * 60  # seconds a response stays replayable
+IDEMPOTENCY_LOCK_TIMEOUT = 60  # seconds a key stays claimed by a request that is still running
 
 # STATICFILES_DIRS = [BASE_DIR / "static"]
 
@@ -195,6 +267,7 @@ JAZZMIN_SETTINGS = {
         "sha": "fas fa-id-badge",            # Good general icon for core identity/profile
         "sha.User": "fas fa-user-circle",    # Specific icon for the User model
         "sha.UserProfileSettings": "fas fa-cog", # Cog for settings, or eye for visibility/control
+        "sha.BackgroundJob": "fas fa-tasks",
         # Alternative for UserProfileSettings: "fas fa-sliders-h", "fas fa-cogs"
 
         # 'investors' app
@@ -18,13 +18,15 @@ from django.contrib import admin
 from django.urls import path,include
 from django.shortcuts import redirect
 from django.conf import settings
-from django.conf.urls.static import static
+from media_management.views import ProtectedMediaView, signed_media_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    # Media is never public: either a signed, expiring link or owners/staff only (KYC documents live here too).
+    path(f"{settings.MEDIA_URL.strip('/')}/signed/<int:expires>/<str:signature>/<path:path>", signed_media_view, name='signed-media'),
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", ProtectedMediaView.as_view(), name='protected-media'),
     path('api/', include('sha.urls')),
+    path('api/media/', include('media_management.urls')),
     path('', lambda request: redirect('/admin/')),
     path('', include('investors.urls')),
-]
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]
\ No newline at end of file
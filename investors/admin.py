@@ -2,17 +2,35 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
-from .models import Investor, InterestRateSetting, InvestmentServiceGroup
+from django.db.models import F
+from django.http import HttpResponseRedirect
+from django.urls import reverse
+
+from .models import Investor, InterestRateSetting, InvestmentServiceGroup, ShareLedgerEntry
 from django.contrib.auth import get_user_model
+from sha.paginators import EstimatedCountPaginator
+from sha.jobs import enqueue_job, pk_ranges
+from sha.utils import iter_values_list, streaming_csv_response
+from django.utils import timezone
+from .jobs import INVESTOR_EXPORT_COLUMNS
+from .inventory import remaining_shares
 
 User = get_user_model()
 
 # Register InvestmentServiceGroup
 @admin.register(InvestmentServiceGroup)
 class InvestmentServiceGroupAdmin(admin.ModelAdmin):
-    list_display = ('id','name', 'is_active', 'created_at')
+    list_display = ('id','name', 'share_capacity', 'is_active', 'created_at')
     list_filter = ('is_active',)
     search_fields = ('name',)
+    readonly_fields = ('shares_remaining',)
+
+    @admin.display(description=_('Shares remaining'))
+    def shares_remaining(self, obj):
+        if obj.pk is None:
+            return '-'
+        remaining = remaining_shares(obj)
+        return _('No limit') if remaining is None else remaining
 
 # Register InterestRateSetting
 @admin.register(InterestRateSetting)
@@ -28,6 +46,23 @@ class InterestRateSettingAdmin(admin.ModelAdmin):
     )
 
 
+class ServiceGroupListFilter(admin.SimpleListFilter):
+    """
+    Filter by service group from a single (id, name) query; the stock related
+    filter instantiates every group and calls __str__ on each one.
+    """
+    title = _("Selected Service Group")
+    parameter_name = 'selected_service_group__id__exact'
+
+    def lookups(self, request, model_admin):
+        return InvestmentServiceGroup.objects.order_by('name').values_list('id', 'name')
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(selected_service_group_id=self.value())
+        return queryset
+
+
 # Custom Admin for Investor
 @admin.register(Investor)
 class InvestorAdmin(admin.ModelAdmin):
@@ -39,15 +74,21 @@ class InvestorAdmin(admin.ModelAdmin):
         'investment_start_date', 'investment_end_date', 'is_investment_active'
     )
     list_filter = (
-        'is_investment_active', 'investment_period', 'selected_service_group' # NEW: Filter by selected group
+        'is_investment_active', 'investment_period', ServiceGroupListFilter
     )
+    # Prefix matches only ('^' = istartswith), each backed by an index on User / InvestmentServiceGroup.
     search_fields = (
-        'user__name', 'user__mobile_number', 'user__email', 'invested_amount',
-        'selected_service_group__name' # NEW: Search by selected group name
+        '^user__mobile_number', '^user__name', '^user__email',
+        '^selected_service_group__name'
     )
-    raw_id_fields = ('user',) # Keep user as raw_id for performance
-    # NEW: Add selected_service_group to raw_id_fields if you anticipate many groups
-    # raw_id_fields = ('user', 'selected_service_group',)
+    # Investor.__str__ (used for each row's action checkbox label) reads both relations.
+    list_select_related = ('user', 'selected_service_group')
+    # Searchable pickers instead of a <select> of every user / group.
+    autocomplete_fields = ('user', 'selected_service_group')
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['recalculate_selected', 'deactivate_matured_selected', 'export_selected', 'download_csv']
 
     fieldsets = (
         (_('Investor Link'), {
@@ -71,6 +112,7 @@ class InvestorAdmin(admin.ModelAdmin):
                 'total_portfolio_value',
                 'investment_start_date',
                 'investment_end_date',
+                'matured_at',
                 'uuid',
                 'created_at',
                 'updated_at',
@@ -88,18 +130,75 @@ class InvestorAdmin(admin.ModelAdmin):
         'total_portfolio_value',
         'investment_start_date',
         'investment_end_date',
+        'matured_at',
         'uuid',
         'created_at',
         'updated_at'
         
     )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            annotated_user_name=F('user__name'),
+            annotated_user_mobile=F('user__mobile_number'),
+        )
+
     def user_display_name(self, obj):
-        return obj.user.get_full_name() if obj.user else '-'
+        return getattr(obj, 'annotated_user_name', None) or getattr(obj, 'annotated_user_mobile', None) or '-'
     user_display_name.short_description = _("User Name")
     user_display_name.admin_order_field = 'user__name'
 
     def user_mobile_number(self, obj):
-        return obj.user.mobile_number if obj.user else '-'
+        return getattr(obj, 'annotated_user_mobile', None) or '-'
     user_mobile_number.short_description = _("Mobile Number")
-    user_mobile_number.admin_order_field = 'user__mobile_number'
\ No newline at end of file
+    user_mobile_number.admin_order_field = 'user__mobile_number'
+
+    # MARK: Bulk actions
+    def _start_job(self, request, queryset, kind, description):
+        """Queues ``kind`` for the selected rows and sends the user to the job's status page."""
+        job = enqueue_job(kind, {'pk_ranges': pk_ranges(queryset)}, user=request.user)
+        self.message_user(request, _("%(description)s has been queued as background job #%(id)s.") % {
+            'description': description, 'id': job.pk,
+        })
+        return HttpResponseRedirect(reverse('admin:sha_backgroundjob_change', args=[job.pk]))
+
+    @admin.action(description=_("Recalculate derived values of selected investments"))
+    def recalculate_selected(self, request, queryset):
+        return self._start_job(request, queryset, 'investors.recalculate', _("Recalculation"))
+
+    @admin.action(description=_("Deactivate selected investments that have matured"))
+    def deactivate_matured_selected(self, request, queryset):
+        return self._start_job(request, queryset, 'investors.deactivate_matured', _("Deactivation"))
+
+    @admin.action(description=_("Export selected investments to CSV"))
+    def export_selected(self, request, queryset):
+        return self._start_job(request, queryset, 'investors.export', _("Export"))
+
+    @admin.action(description=_("Download selected investments as CSV"))
+    def download_csv(self, request, queryset):
+        header = [column for column, lookup in INVESTOR_EXPORT_COLUMNS]
+        lookups = [lookup for column, lookup in INVESTOR_EXPORT_COLUMNS]
+        return streaming_csv_response(
+            f"investments-{timezone.localdate():%Y%m%d}.csv", header, iter_values_list(queryset, lookups),
+        )
+
+
+@admin.register(ShareLedgerEntry)
+class ShareLedgerEntryAdmin(admin.ModelAdmin):
+    # The ledger is append-only: entries are written by investors.ledger, never edited here.
+    list_display = ('id', 'investor', 'kind', 'shares', 'share_value', 'amount', 'effective_date', 'created_by', 'created_at')
+    list_filter = ('kind',)
+    list_select_related = ('investor__user', 'investor__selected_service_group', 'created_by')
+    search_fields = ('^investor__user__mobile_number',)
+    raw_id_fields = ('investor',)
+    readonly_fields = ('investor', 'kind', 'shares', 'share_value', 'amount', 'effective_date', 'created_by', 'created_at')
+    ordering = ('-id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
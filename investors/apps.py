@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class InvestorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'investors'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from . import jobs  # registers the admin bulk action jobs
+        from .inventory import provision_on_save, release_on_delete, release_on_maturity
+        from .ledger import record_share_changes
+        from .models import InterestRateSetting, InvestmentServiceGroup, Investor
+        from .quotes import invalidate_rate_matrix
+        from .signals import investments_matured
+
+        post_save.connect(record_share_changes, sender=Investor, dispatch_uid='ledger_save_investor')
+        post_save.connect(provision_on_save, sender=InvestmentServiceGroup, dispatch_uid='inventory_save_group')
+        post_delete.connect(release_on_delete, sender=Investor, dispatch_uid='inventory_delete_investor')
+        investments_matured.connect(release_on_maturity, sender=Investor, dispatch_uid='inventory_release_matured')
+
+        for model in (InvestmentServiceGroup, InterestRateSetting):
+            post_save.connect(invalidate_rate_matrix, sender=model, dispatch_uid=f'rate_matrix_save_{model.__name__}')
+            post_delete.connect(invalidate_rate_matrix, sender=model, dispatch_uid=f'rate_matrix_delete_{model.__name__}')
@@ -0,0 +1,131 @@
+# SHA_GROUP/investors/filters.py
+from datetime import date
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.pagination import PageNumberPagination
+
+
+def _parse_bool(name, value):
+    lowered = value.strip().lower()
+    if lowered in ('true', '1', 'yes'):
+        return True
+    if lowered in ('false', '0', 'no'):
+        return False
+    raise ValidationError({name: ["Must be true or false."]})
+
+
+def _parse_date(name, value):
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        raise ValidationError({name: ["Must be a date in YYYY-MM-DD format."]})
+
+
+def _parse_int_list(name, value, max_items):
+    try:
+        values = [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise ValidationError({name: ["Must be a comma separated list of IDs."]})
+    if not values or len(values) > max_items:
+        raise ValidationError({name: [f"Give between 1 and {max_items} values."]})
+    return values
+
+
+#MARK: Investor Filter
+class InvestorFilterBackend(BaseFilterBackend):
+    """
+    Query parameters for InvestorViewSet.list.
+
+    Every parameter maps onto an index on Investor or User (see their Meta):
+        group=1,2          selected_service_group in (...)
+        period=5           investment_period (requires group)
+        active=true        is_investment_active
+        start_from/start_to                     investment_start_date range
+        end_from/end_to    investment_end_date range (requires active)
+        mobile=+9715       user mobile number prefix
+        name=moh           user name prefix
+        ordering=-investment_end_date           one of ORDERING_FIELDS
+    Free text is prefix-only and has a minimum length, so no parameter can
+    turn into a LIKE '%...%' scan over the whole book.
+    """
+    MAX_GROUPS = 20
+    MIN_PREFIX_LENGTH = 3
+    PERIODS = {3, 5, 10}
+    ORDERING_FIELDS = ('investment_start_date', 'investment_end_date', 'created_at')
+
+    DATE_RANGES = {
+        'start_from': 'investment_start_date__gte',
+        'start_to': 'investment_start_date__lte',
+        'end_from': 'investment_end_date__gte',
+        'end_to': 'investment_end_date__lte',
+    }
+    # istartswith compiles to LIKE 'x%' on MySQL (case-insensitive collation), which can use the index.
+    PREFIXES = {
+        'mobile': 'user__mobile_number__istartswith',
+        'name': 'user__name__istartswith',
+    }
+
+    # Parameters that only reach an index behind the leading column(s) named here.
+    REQUIRES = {
+        'period': 'group',
+        'end_from': 'active',
+        'end_to': 'active',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        filters = {}
+
+        for param, required in self.REQUIRES.items():
+            if params.get(param) and not params.get(required):
+                raise ValidationError({param: [f"Can only be used together with {required}."]})
+
+        if params.get('group'):
+            filters['selected_service_group__in'] = _parse_int_list('group', params['group'], self.MAX_GROUPS)
+
+        if params.get('period'):
+            try:
+                period = int(params['period'])
+            except ValueError:
+                period = None
+            if period not in self.PERIODS:
+                raise ValidationError({'period': ["Investment period must be 3, 5, or 10 years."]})
+            filters['investment_period'] = period
+
+        if params.get('active'):
+            filters['is_investment_active'] = _parse_bool('active', params['active'])
+
+        for param, lookup in self.DATE_RANGES.items():
+            if params.get(param):
+                filters[lookup] = _parse_date(param, params[param])
+
+        for param, lookup in self.PREFIXES.items():
+            value = params.get(param, '').strip()
+            if not value:
+                continue
+            if len(value) < self.MIN_PREFIX_LENGTH:
+                raise ValidationError({param: [f"Enter at least {self.MIN_PREFIX_LENGTH} characters."]})
+            filters[lookup] = value
+
+        if filters:
+            queryset = queryset.filter(**filters)
+
+        ordering = params.get('ordering')
+        if ordering:
+            if ordering.lstrip('-') not in self.ORDERING_FIELDS:
+                raise ValidationError({'ordering': [f"Order by one of: {', '.join(self.ORDERING_FIELDS)} (prefix with - for descending)."]})
+            queryset = queryset.order_by(ordering, '-pk' if ordering.startswith('-') else 'pk')
+
+        return queryset
+
+
+#MARK: Pagination
+class OptionalPageNumberPagination(PageNumberPagination):
+    """
+    Pages only when the client asks for one with ?page_size=..., so existing
+    clients keep receiving the full list. Page size is capped.
+    """
+    page_size = None
+    page_size_query_param = 'page_size'
+    max_page_size = 200
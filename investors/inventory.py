@@ -0,0 +1,131 @@
+# SHA_GROUP/investors/inventory.py
+"""
+Share inventory of service groups with a share_capacity.
+
+A capped group's unallocated shares live in ``inventory_stripes``
+ShareInventoryStripe rows. A purchase takes its shares from one stripe with
+
+    UPDATE ... SET remaining = remaining - n WHERE stripe = s AND remaining >= n
+
+starting at a random stripe, so there is no read-then-write race and
+concurrent buyers only queue on a row lock when they land on the same
+stripe. The decrement is part of the buyer's transaction and rolls back with
+it. Only when no single stripe holds enough are the stripes locked together
+and pooled (allocate_pooled).
+
+Groups without a capacity have no stripes and every call here is a no-op.
+"""
+import random
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Sum
+
+from sha.utils import bulk_upsert
+from .models import InvestmentServiceGroup, Investor, ShareInventoryStripe
+
+
+class SoldOut(Exception):
+    pass
+
+
+def _spread(total, count):
+    """``total`` split into ``count`` amounts differing by at most one cent."""
+    cents = int(total * 100)
+    share, extra = divmod(cents, count)
+    return [Decimal(share + (1 if stripe < extra else 0)).scaleb(-2) for stripe in range(count)]
+
+
+#MARK: Provisioning
+def provision_inventory(group):
+    """
+    (Re)builds the stripes of ``group`` as its capacity minus the shares held
+    in its active investments, spread evenly over ``inventory_stripes`` rows.
+    Runs whenever a group is saved, which also reconciles shares changed
+    outside allocate/release (e.g. admin edits).
+    """
+    stripes = ShareInventoryStripe.objects.filter(service_group=group)
+    with transaction.atomic():
+        list(stripes.select_for_update().values_list('pk', flat=True))
+        if group.share_capacity is None:
+            stripes.delete()
+            return None
+        held = Investor.objects.filter(selected_service_group=group, is_investment_active=True) \
+            .aggregate(total=Sum('number_of_shares'))['total'] or Decimal('0.00')
+        remaining = max(group.share_capacity - held, Decimal('0.00'))
+        stripes.filter(stripe__gte=group.inventory_stripes).delete()
+        bulk_upsert(
+            ShareInventoryStripe,
+            [
+                ShareInventoryStripe(service_group=group, stripe=stripe, remaining=amount)
+                for stripe, amount in enumerate(_spread(remaining, group.inventory_stripes))
+            ],
+            ['service_group', 'stripe'], ['remaining'],
+        )
+    return remaining
+
+
+def provision_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        provision_inventory(instance)
+
+
+def remaining_shares(group):
+    if group.share_capacity is None:
+        return None
+    return ShareInventoryStripe.objects.filter(service_group=group).aggregate(total=Sum('remaining'))['total'] or Decimal('0.00')
+
+
+#MARK: Allocation
+def allocate(group, shares):
+    """
+    Takes ``shares`` from the inventory of ``group``; call inside the
+    transaction that records the purchase. Raises SoldOut when the group
+    doesn't have that many left.
+    """
+    if group is None or group.share_capacity is None:
+        return
+    stripes = ShareInventoryStripe.objects.filter(service_group_id=group.pk)
+    count = group.inventory_stripes
+    start = random.randrange(count)
+    for offset in range(count):
+        if stripes.filter(stripe=(start + offset) % count, remaining__gte=shares).update(remaining=F('remaining') - shares):
+            return
+    allocate_pooled(group, shares)
+
+
+def allocate_pooled(group, shares):
+    """Slow path for a group close to selling out: locks every stripe, takes ``shares`` from the pool and re-spreads the rest."""
+    with transaction.atomic():
+        rows = list(ShareInventoryStripe.objects.select_for_update().filter(service_group_id=group.pk).order_by('stripe'))
+        total = sum((row.remaining for row in rows), Decimal('0.00'))
+        if not rows or total < shares:
+            raise SoldOut(f"Only {total} shares are left in {group.name}.")
+        for row, amount in zip(rows, _spread(total - shares, len(rows))):
+            row.remaining = amount
+        ShareInventoryStripe.objects.bulk_update(rows, ['remaining'])
+
+
+def release(group, shares):
+    """Returns ``shares`` to the inventory of ``group`` (redemptions, deleted investments)."""
+    if group is None or group.share_capacity is None or shares <= 0:
+        return
+    ShareInventoryStripe.objects.filter(
+        service_group_id=group.pk, stripe=random.randrange(group.inventory_stripes),
+    ).update(remaining=F('remaining') + shares)
+
+
+def release_on_delete(sender, instance, **kwargs):
+    if instance.is_investment_active and instance.selected_service_group_id:
+        release(instance.selected_service_group, instance.number_of_shares)
+
+
+def release_on_maturity(sender, investor_ids, **kwargs):
+    """investments_matured receiver: matured shares no longer count against capacity."""
+    held = dict(
+        Investor.objects.filter(pk__in=investor_ids, selected_service_group__share_capacity__isnull=False)
+        .values('selected_service_group').annotate(total=Sum('number_of_shares'))
+        .values_list('selected_service_group', 'total').order_by()
+    )
+    for group in InvestmentServiceGroup.objects.filter(pk__in=held):
+        release(group, held[group.pk])
@@ -0,0 +1,130 @@
+# SHA_GROUP/investors/jobs.py
+"""
+Background jobs started from InvestorAdmin actions.
+
+The selection travels in the payload as primary key runs (sha.jobs.pk_ranges)
+and is processed in chunks of INVESTOR_JOB_BATCH_SIZE rows, one short
+transaction per chunk, with progress reported after each.
+"""
+import csv
+import io
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from sha.jobs import count_pk_ranges, iter_pk_chunks, register_job
+from sha.utils import csv_safe_row
+from .models import InterestRateSetting, Investor, ShareLedgerEntry
+from .maturity import close_matured_batch
+from .valuation import open_tranches, project_tranches
+
+DERIVED_FIELDS = [
+    'invested_amount', 'interest_rate_applied', 'final_return_amount', 'profit',
+    'current_accrued_profit', 'total_portfolio_value', 'investment_end_date', 'updated_at',
+]
+
+INVESTOR_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('uuid', 'uuid'),
+    ('user_id', 'user_id'),
+    ('mobile_number', 'user__mobile_number'),
+    ('name', 'user__name'),
+    ('service_group', 'selected_service_group__name'),
+    ('number_of_shares', 'number_of_shares'),
+    ('invested_amount', 'invested_amount'),
+    ('investment_period', 'investment_period'),
+    ('interest_rate_applied', 'interest_rate_applied'),
+    ('final_return_amount', 'final_return_amount'),
+    ('profit', 'profit'),
+    ('current_accrued_profit', 'current_accrued_profit'),
+    ('total_portfolio_value', 'total_portfolio_value'),
+    ('investment_start_date', 'investment_start_date'),
+    ('investment_end_date', 'investment_end_date'),
+    ('is_investment_active', 'is_investment_active'),
+]
+
+
+def get_batch_size():
+    return getattr(settings, 'INVESTOR_JOB_BATCH_SIZE', 500)
+
+
+def _chunks(job):
+    ranges = job.payload['pk_ranges']
+    job.report_progress(processed=0, total=count_pk_ranges(ranges))
+    return iter_pk_chunks(ranges, get_batch_size())
+
+
+#MARK: Recalculate
+@register_job('investors.recalculate')
+def recalculate_investments(job):
+    """
+    Recomputes the derived fields of the selection, as calculate_derived_fields
+    would, and writes them back with bulk_update. Each chunk loads its active
+    rates and its ledger entries with one query each.
+    """
+    processed = updated = 0
+    for chunk in _chunks(job):
+        # Matured investments keep the values frozen at maturity (see investors.maturity).
+        investors = list(Investor.objects.filter(pk__in=chunk, matured_at__isnull=True).select_related('selected_service_group'))
+        rates = dict(
+            ((group_id, period), rate) for group_id, period, rate in InterestRateSetting.objects.filter(
+                is_active=True, service_group_id__in={investor.selected_service_group_id for investor in investors},
+            ).values_list('service_group_id', 'period_in_years', 'interest_percentage')
+        )
+        entries = ShareLedgerEntry.entries_by_investor([investor.pk for investor in investors])
+        now = timezone.now()
+        for investor in investors:
+            derived = project_tranches(
+                open_tranches(entries.get(investor.pk, [])),
+                rates.get((investor.selected_service_group_id, investor.investment_period)),
+                investor.investment_period, investor.investment_start_date, as_of=now.date(),
+                is_active=investor.is_investment_active,
+            )
+            for field_name, value in derived.items():
+                setattr(investor, field_name, value)
+            investor.updated_at = now
+        with transaction.atomic():
+            Investor.objects.bulk_update(investors, DERIVED_FIELDS)
+        processed += len(chunk)
+        updated += len(investors)
+        job.report_progress(processed=processed, updated=updated)
+    return {'updated': updated}
+
+
+#MARK: Deactivate matured
+@register_job('investors.deactivate_matured')
+def deactivate_matured_investments(job):
+    """Closes the selected investments whose end date has passed, as process_maturities does, one batch per chunk."""
+    today = timezone.localdate()
+    processed = deactivated = 0
+    for chunk in _chunks(job):
+        deactivated += close_matured_batch(Investor.objects.filter(pk__in=chunk), as_of=today, batch_size=len(chunk))
+        processed += len(chunk)
+        job.report_progress(processed=processed, deactivated=deactivated)
+    return {'deactivated': deactivated}
+
+
+#MARK: Export
+@register_job('investors.export')
+def export_investments(job):
+    """Writes the selection to a CSV file attached to the job as its output."""
+    headers = [header for header, lookup in INVESTOR_EXPORT_COLUMNS]
+    lookups = [lookup for header, lookup in INVESTOR_EXPORT_COLUMNS]
+    processed = 0
+    with tempfile.TemporaryFile() as spool:
+        text = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+        writer = csv.writer(text)
+        writer.writerow(headers)
+        for chunk in _chunks(job):
+            writer.writerows(map(csv_safe_row, Investor.objects.filter(pk__in=chunk).order_by('pk').values_list(*lookups)))
+            processed += len(chunk)
+            job.report_progress(processed=processed)
+        text.flush()
+        spool.seek(0)
+        job.output.save(f"investments-{timezone.localdate():%Y%m%d}-job{job.pk}.csv", File(spool), save=False)
+        text.detach()
+    job.save(update_fields=['output', 'updated_at'])
+    return {'rows': processed}
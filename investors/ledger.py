@@ -0,0 +1,208 @@
+# SHA_GROUP/investors/ledger.py
+"""
+Append-only share ledger of an investment.
+
+Every change to Investor.number_of_shares leaves a ShareLedgerEntry.
+Purchases and redemptions go through record_entry, which applies the entry
+with one atomic UPDATE ... SET number_of_shares = number_of_shares + n, so
+concurrent top-ups never overwrite each other and the row itself always holds
+the current balance. Changes made by saving the model directly (admin edits,
+the initial create) are recorded by the post_save receiver below, connected
+in InvestorsConfig.ready, as opening or adjustment entries.
+
+The ledger is also what the investment is valued from: every purchase
+opens a tranche that accrues from its own date and redemptions consume the
+oldest tranches first (investors.valuation.project_tranches), both in
+Investor's derived fields and in tranches() below.
+
+ShareBalanceCheckpoint rows, written by the checkpoint_share_ledger command,
+bound the work needed to reconstruct a past balance: the nearest checkpoint
+plus the entries dated after it. Balances are always cut by effective_date,
+never by entry id, because ids don't follow effective dates (opening entries
+carry the investment's start date) nor commit order.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.utils import timezone
+
+from .inventory import allocate, release
+from .jobs import DERIVED_FIELDS
+from .models import Investor, ShareBalanceCheckpoint, ShareLedgerEntry
+from .valuation import CENT, Position, RATE_UNIT_PLACES, from_units, open_tranches, to_units, value_positions
+
+
+class InsufficientShares(Exception):
+    pass
+
+
+class InvestmentClosed(Exception):
+    pass
+
+
+def _share_value(investor):
+    group = investor.selected_service_group
+    return group.share_value if group else Decimal('0.00')
+
+
+#MARK: Entries
+def record_entry(investor, shares, kind, user=None):
+    """
+    Appends ``shares`` (negative for a redemption) to the ledger of
+    ``investor`` and applies it to the running balance. The UPDATE keeps the
+    row locked until commit, so the derived fields recomputed afterwards see
+    the final balance. Purchases take their shares from the group's
+    inventory (investors.inventory.SoldOut when it runs out), redemptions
+    return them. Raises InsufficientShares when a redemption would take the
+    balance below zero and InvestmentClosed when the investment is inactive
+    or matured (checked by the UPDATE itself, so a concurrent maturity run
+    can't slip in between). Returns the entry.
+    """
+    if not shares:
+        raise ValueError("A ledger entry must change the share balance.")
+    with transaction.atomic():
+        open_investment = Investor.objects.filter(pk=investor.pk, is_investment_active=True, matured_at__isnull=True)
+        balance = open_investment
+        if shares > 0:
+            allocate(investor.selected_service_group, shares)
+        else:
+            balance = balance.filter(number_of_shares__gte=-shares)
+        if not balance.update(number_of_shares=F('number_of_shares') + shares, updated_at=timezone.now()):
+            # Raising rolls back the allocation above with the savepoint.
+            if not open_investment.exists():
+                raise InvestmentClosed("This investment is closed; its shares can no longer change.")
+            raise InsufficientShares("Not enough shares to redeem.")
+        if shares < 0:
+            release(investor.selected_service_group, -shares)
+
+        investor.refresh_from_db()
+        share_value = _share_value(investor)
+        entry = ShareLedgerEntry.objects.create(
+            investor=investor, kind=kind, shares=shares, share_value=share_value,
+            amount=(shares * share_value).quantize(CENT), created_by=user,
+        )
+        investor.save(update_fields=DERIVED_FIELDS)
+    return entry
+
+
+def record_share_changes(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Records a balance written by a plain save() as an opening entry, or as an
+    adjustment for the difference to the ledger's balance.
+    """
+    if raw or (update_fields is not None and 'number_of_shares' not in update_fields):
+        return
+    current = instance.number_of_shares
+    if created:
+        kind, shares, effective_date = ShareLedgerEntry.KIND_OPENING, current, instance.investment_start_date
+    else:
+        kind, shares, effective_date = ShareLedgerEntry.KIND_ADJUSTMENT, current - shares_as_of(instance), timezone.localdate()
+    if not shares:
+        return
+    share_value = _share_value(instance)
+    ShareLedgerEntry.objects.create(
+        investor=instance, kind=kind, shares=shares, share_value=share_value,
+        amount=(shares * share_value).quantize(CENT), effective_date=effective_date or timezone.localdate(),
+    )
+
+
+#MARK: Balances
+def shares_as_of(investor, day=None):
+    """
+    Share balance of ``investor`` per its ledger at the end of ``day`` (or
+    now): the latest checkpoint up to that day plus the entries dated after
+    its as_of.
+    """
+    checkpoints = ShareBalanceCheckpoint.objects.filter(investor=investor)
+    entries = ShareLedgerEntry.objects.filter(investor=investor)
+    if day is not None:
+        checkpoints = checkpoints.filter(as_of__lte=day)
+        entries = entries.filter(effective_date__lte=day)
+    checkpoint = checkpoints.order_by('-as_of').values('as_of', 'shares').first()
+    shares = Decimal('0.00')
+    if checkpoint:
+        entries = entries.filter(effective_date__gt=checkpoint['as_of'])
+        shares = checkpoint['shares']
+    return shares + (entries.aggregate(total=Sum('shares'))['total'] or Decimal('0.00'))
+
+
+def tranches(investor, as_of):
+    """
+    Open purchase tranches of ``investor`` with the profit each has accrued by
+    ``as_of``. Entries apply in (effective_date, id) order: every increase
+    starts a tranche on its effective date, decreases consume the oldest
+    tranches first. All tranches accrue at the investment's applied rate and
+    stop at its end date.
+    """
+    held = open_tranches(ShareLedgerEntry.entries_by_investor([investor.pk]).get(investor.pk, []))
+    rate = to_units(investor.interest_rate_applied, RATE_UNIT_PLACES)
+    positions = [
+        Position(to_units((shares * share_value).quantize(CENT)), rate, investor.investment_period,
+                 start, investor.investment_end_date, investor.is_investment_active)
+        for start, shares, share_value in held
+    ]
+    return [
+        {
+            'effective_date': start,
+            'shares': shares,
+            'share_value': share_value,
+            'invested_amount': from_units(position.principal),
+            'accrued_profit': from_units(valuation.accrued),
+        }
+        for (start, shares, share_value), position, valuation in zip(held, positions, value_positions(positions, as_of))
+    ]
+
+
+#MARK: Checkpoints
+def write_checkpoints(interval, lag_days=2, chunk_size=1000):
+    """
+    Writes a checkpoint as of ``lag_days`` before today for every investment
+    with at least ``interval`` entries dated between its last checkpoint and
+    that day. Entries are only ever written with today's date (or, for the
+    opening entry, with the new investment's start date), so after the lag no
+    transaction still in flight can add one to the range being summed.
+    Investments are scanned in primary key chunks, three queries and one bulk
+    insert per chunk. Returns the count.
+    """
+    as_of = timezone.localdate() - timedelta(days=lag_days)
+    latest = ShareBalanceCheckpoint.objects.filter(investor_id=OuterRef('investor_id')).order_by('-as_of')
+    written = 0
+    last_pk = 0
+    while True:
+        investor_ids = list(Investor.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not investor_ids:
+            return written
+        last_pk = investor_ids[-1]
+
+        pending = list(
+            ShareLedgerEntry.objects.filter(investor_id__in=investor_ids, effective_date__lte=as_of)
+            .annotate(checkpointed=Subquery(latest.values('as_of')[:1]))
+            .filter(Q(checkpointed__isnull=True) | Q(effective_date__gt=F('checkpointed')))
+            .values('investor_id')
+            .annotate(entries=Count('id'), shares=Sum('shares'), amount=Sum('amount'))
+            .filter(entries__gte=interval)
+            .order_by()
+        )
+        if not pending:
+            continue
+        previous = {
+            checkpoint.investor_id: checkpoint
+            for checkpoint in ShareBalanceCheckpoint.objects.filter(
+                investor_id__in=[row['investor_id'] for row in pending], as_of=Subquery(latest.values('as_of')[:1]),
+            )
+        }
+        checkpoints = []
+        for row in pending:
+            base = previous.get(row['investor_id'])
+            checkpoints.append(ShareBalanceCheckpoint(
+                investor_id=row['investor_id'],
+                as_of=as_of,
+                shares=(base.shares if base else 0) + row['shares'],
+                amount=(base.amount if base else 0) + row['amount'],
+                entry_count=(base.entry_count if base else 0) + row['entries'],
+            ))
+        with transaction.atomic():
+            ShareBalanceCheckpoint.objects.bulk_create(checkpoints)
+        written += len(checkpoints)
@@ -0,0 +1,90 @@
+import threading
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection, transaction
+
+from investors.inventory import SoldOut, allocate, remaining_shares
+from investors.models import InvestmentServiceGroup
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures share allocation throughput under parallel buyers for several stripe counts. "
+        "Each run uses a throwaway capped service group, sized so the last buyers sell it out, "
+        "and checks that exactly its capacity was allocated. Run it against the production "
+        "database engine; SQLite serialises all writers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=8, help="Concurrent buyer threads (default: 8).")
+        parser.add_argument('--purchases', type=int, default=2000,
+                            help="Purchase attempts per run, across all buyers (default: 2000).")
+        parser.add_argument('--stripes', type=int, nargs='+', default=[1, 4, 16],
+                            help="Stripe counts to compare (default: 1 4 16).")
+        parser.add_argument('--hold-ms', type=float, default=2.0,
+                            help="Time each purchase transaction stays open after allocating, "
+                                 "standing in for the rest of the purchase (default: 2).")
+
+    def handle(self, *args, **options):
+        if options['buyers'] < 1 or options['purchases'] < 1 or min(options['stripes']) < 1:
+            raise CommandError("--buyers, --purchases and --stripes must be at least 1.")
+        # 95% of the attempts fit, so every run also exercises the sold-out path.
+        capacity = Decimal(int(options['purchases'] * 0.95))
+
+        for stripes in options['stripes']:
+            group = InvestmentServiceGroup.objects.create(
+                name=f"allocation-benchmark-{uuid.uuid4().hex[:12]}", share_value=Decimal('1.00'),
+                share_capacity=capacity, inventory_stripes=stripes, is_active=False,
+            )
+            try:
+                counts, elapsed = self.run(group, options['buyers'], options['purchases'], options['hold_ms'] / 1000)
+                left = remaining_shares(group)
+            finally:
+                group.delete()
+
+            consistent = counts['allocated'] + left == capacity
+            self.stdout.write(
+                f"stripes={stripes:<3} buyers={options['buyers']:<3} "
+                f"{counts['allocated'] / elapsed:8.1f} allocations/s  "
+                f"allocated={counts['allocated']} sold_out={counts['sold_out']} errors={counts['errors']} "
+                f"left={left} in {elapsed:.2f}s "
+                + (self.style.SUCCESS("consistent") if consistent else self.style.ERROR("INCONSISTENT"))
+            )
+
+    def run(self, group, buyers, purchases, hold):
+        counts = {'allocated': 0, 'sold_out': 0, 'errors': 0}
+        lock = threading.Lock()
+        attempts = iter(range(purchases))
+
+        def buyer():
+            local = {'allocated': 0, 'sold_out': 0, 'errors': 0}
+            try:
+                while True:
+                    with lock:
+                        if next(attempts, None) is None:
+                            break
+                    try:
+                        with transaction.atomic():
+                            allocate(group, Decimal('1.00'))
+                            time.sleep(hold)
+                        local['allocated'] += 1
+                    except SoldOut:
+                        local['sold_out'] += 1
+                    except DatabaseError:
+                        local['errors'] += 1
+            finally:
+                connection.close()
+                with lock:
+                    for key, value in local.items():
+                        counts[key] += value
+
+        threads = [threading.Thread(target=buyer) for _ in range(buyers)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts, time.monotonic() - started
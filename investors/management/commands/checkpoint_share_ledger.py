@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from investors.ledger import write_checkpoints
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes share balance checkpoints, as of LEDGER_CHECKPOINT_LAG_DAYS before today, for investments "
+        "with at least LEDGER_CHECKPOINT_INTERVAL ledger entries since their last checkpoint. "
+        "Run periodically (e.g. nightly)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=None,
+                            help="Entries since the last checkpoint that trigger a new one "
+                                 "(default: settings.LEDGER_CHECKPOINT_INTERVAL).")
+        parser.add_argument('--lag-days', type=int, default=None,
+                            help="Days a checkpoint trails today, so entries still being written are left out "
+                                 "(default: settings.LEDGER_CHECKPOINT_LAG_DAYS).")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Investments scanned per round (default: 1000).")
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or getattr(settings, 'LEDGER_CHECKPOINT_INTERVAL', 50)
+        lag_days = options['lag_days']
+        if lag_days is None:
+            lag_days = getattr(settings, 'LEDGER_CHECKPOINT_LAG_DAYS', 2)
+        if interval < 1 or options['chunk_size'] < 1:
+            raise CommandError("--interval and --chunk-size must be at least 1.")
+        if lag_days < 1:
+            raise CommandError("--lag-days must be at least 1.")
+        written = write_checkpoints(interval, lag_days=lag_days, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} checkpoint(s)."))
@@ -0,0 +1,190 @@
+import json
+import os
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from investors.models import InterestRateSetting, InvestmentServiceGroup, Investor
+from sha.utils import iter_values_list
+
+SNAPSHOT_MODELS = [InvestmentServiceGroup, InterestRateSetting, Investor]
+STATE_FILE = 'snapshot_state.json'
+FORMAT_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def arrow_type(pa, field):
+    """Arrow type for a concrete model field; decimals keep their precision and scale."""
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.ForeignKey):
+        return pa.int64()
+    if isinstance(field, (models.IntegerField, models.AutoField)):
+        return pa.int64()
+    return pa.string()  # CharField, TextField, UUIDField...
+
+
+def build_schema(pa, model):
+    fields = model._meta.concrete_fields
+    columns = [field.attname for field in fields]
+    schema = pa.schema([pa.field(field.attname, arrow_type(pa, field), nullable=field.null)
+                        for field in fields])
+    converters = [str if isinstance(field, models.UUIDField) else None for field in fields]
+    return columns, schema, converters
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes a point-in-time snapshot of InvestmentServiceGroup, InterestRateSetting and Investor "
+        "to Parquet (or Arrow IPC) files, one per table, reading rows in bounded chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output_dir', help="Directory receiving one sub-directory per snapshot.")
+        parser.add_argument('--format', choices=sorted(FORMAT_EXTENSIONS), default='parquet')
+        parser.add_argument('--chunk-size', type=int, default=20000,
+                            help="Rows read and written per batch (default: 20000).")
+        parser.add_argument('--since',
+                            help="Only export rows with updated_at after this ISO 8601 timestamp.")
+        parser.add_argument('--incremental', action='store_true',
+                            help=f"Only export rows updated since the previous run (tracked in {STATE_FILE}). "
+                                 "Deleted rows are not reported; take a full snapshot to reconcile.")
+        parser.add_argument('--overlap', type=int, default=600,
+                            help="Rows updated less than this many seconds before the run starts are left for the "
+                                 "next --incremental run, so rows committed late with an earlier updated_at are not "
+                                 "missed. Must exceed the longest write transaction (default: 600).")
+
+    def handle(self, *args, **options):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise CommandError("pyarrow is required for snapshot exports: pip install pyarrow")
+
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        if options['since'] and options['incremental']:
+            raise CommandError("Use either --since or --incremental, not both.")
+        if options['overlap'] < 0:
+            raise CommandError("--overlap must not be negative.")
+        overlap = timedelta(seconds=options['overlap'])
+
+        output_dir = options['output_dir']
+        os.makedirs(output_dir, exist_ok=True)
+        state_path = os.path.join(output_dir, STATE_FILE)
+        state = {}
+        if os.path.exists(state_path):
+            with open(state_path) as f:
+                state = json.load(f)
+
+        since = None
+        if options['since']:
+            try:
+                since = parse_datetime(options['since'])
+            except ValueError:  # well formed but not a real time, e.g. 2025-02-30T00:00:00Z
+                since = None
+            if since is None:
+                raise CommandError("--since must be an ISO 8601 timestamp, e.g. 2025-01-31T00:00:00Z.")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since, dt_timezone.utc)
+
+        started = timezone.now()
+        cutoff = started - overlap
+        label = started.strftime('%Y%m%dT%H%M%SZ') + ('-incremental' if since or options['incremental'] else '')
+        snapshot_dir = os.path.join(output_dir, label)
+        os.makedirs(snapshot_dir, exist_ok=True)
+
+        # One transaction for every read: on InnoDB (REPEATABLE READ) all chunks of
+        # all tables then come from the same consistent snapshot.
+        new_state = dict(state)
+        with transaction.atomic():
+            for model in SNAPSHOT_MODELS:
+                queryset = model._default_manager.all()
+                if since is not None:
+                    queryset = queryset.filter(updated_at__gt=since)
+                previous = state.get(model._meta.label)
+                if options['incremental']:
+                    # Resume after the last (updated_at, pk) exported and stop at the
+                    # cutoff: writes still in flight commit before the next run.
+                    queryset = queryset.filter(updated_at__lte=cutoff)
+                    if previous:
+                        queryset = queryset.filter(self.after_keyset(model, previous, overlap))
+                rows, keyset = self.export_model(pa, model, snapshot_dir, options['format'], chunk_size, queryset, cutoff)
+                if keyset is not None:
+                    new_state[model._meta.label] = {'watermark': keyset[0].isoformat(), 'pk': keyset[1]}
+                elif model._meta.label not in new_state:
+                    new_state[model._meta.label] = {'watermark': cutoff.isoformat(), 'pk': None}
+                self.stdout.write(f"{model._meta.label}: {rows} row(s)")
+
+        with open(state_path + '.tmp', 'w') as f:
+            json.dump(new_state, f, indent=2)
+        os.replace(state_path + '.tmp', state_path)
+
+        self.stdout.write(self.style.SUCCESS(f"Snapshot written to {snapshot_dir}"))
+
+    def after_keyset(self, model, previous, overlap):
+        """Rows past the (updated_at, pk) keyset saved by the previous run."""
+        if isinstance(previous, str):  # state written before the keyset existed: a bare watermark
+            previous = {'watermark': previous}
+        if 'recent' in previous:  # state written with a re-read window: read that window once more
+            previous = {'watermark': (parse_datetime(previous['watermark']) - overlap).isoformat()}
+        watermark = parse_datetime(previous['watermark'])
+        if previous.get('pk') is None:
+            return models.Q(updated_at__gt=watermark)
+        return models.Q(updated_at__gt=watermark) | models.Q(updated_at=watermark, pk__gt=previous['pk'])
+
+    def export_model(self, pa, model, directory, fmt, chunk_size, queryset, cutoff):
+        """
+        Streams ``queryset`` into one file. Returns the row count and the
+        highest (updated_at, pk) at or before ``cutoff``, where the next
+        incremental run resumes; None if no such row was read.
+        """
+        columns, schema, converters = build_schema(pa, model)
+        pk_index = columns.index(model._meta.pk.attname)
+        updated_at_index = columns.index('updated_at')
+
+        path = os.path.join(directory, model._meta.db_table + FORMAT_EXTENSIONS[fmt])
+        writer = self.open_writer(pa, fmt, path + '.tmp', schema)
+        rows = 0
+        keyset = None
+        try:
+            chunk = []
+            for row in iter_values_list(queryset, columns, chunk_size=chunk_size):
+                row_keyset = (row[updated_at_index], row[pk_index])
+                if row_keyset[0] <= cutoff and (keyset is None or row_keyset > keyset):
+                    keyset = row_keyset
+                chunk.append(row)
+                if len(chunk) == chunk_size:
+                    self.write_chunk(pa, writer, schema, chunk, converters)
+                    rows += len(chunk)
+                    chunk = []
+            if chunk:
+                self.write_chunk(pa, writer, schema, chunk, converters)
+                rows += len(chunk)
+        finally:
+            writer.close()
+        os.replace(path + '.tmp', path)
+        return rows, keyset
+
+    def open_writer(self, pa, fmt, path, schema):
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(path, schema, compression='zstd')
+        return pa.ipc.new_file(path, schema)
+
+    def write_chunk(self, pa, writer, schema, chunk, converters):
+        arrays = []
+        for index, values in enumerate(zip(*chunk)):
+            convert = converters[index]
+            if convert is not None:
+                values = [None if value is None else convert(value) for value in values]
+            arrays.append(pa.array(values, type=schema.field(index).type))
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
@@ -0,0 +1,115 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from investors.models import Investor, ShareLedgerEntry
+from investors.statements import statement_filename, write_statements
+from investors.valuation import open_tranches
+
+User = get_user_model()
+
+POSITION_FIELDS = [
+    'id', 'user_id', 'investment_period', 'number_of_shares', 'invested_amount', 'interest_rate_applied',
+    'final_return_amount', 'investment_start_date', 'investment_end_date', 'is_investment_active',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders an HTML statement for every investor into <STATEMENTS_ROOT>/<date>/. "
+        "Users are loaded in chunks and rendered in a process pool; statements that already "
+        "exist are skipped, so an interrupted run can simply be started again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Statement date, YYYY-MM-DD (default: today).")
+        parser.add_argument('--output-dir', help="Base directory (default: settings.STATEMENTS_ROOT).")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Users loaded from the database per round (default: 1000).")
+        parser.add_argument('--task-size', type=int, default=200,
+                            help="Statements rendered per pool task (default: 200).")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 2,
+                            help="Renderer processes (default: number of CPUs).")
+        parser.add_argument('--force', action='store_true',
+                            help="Re-render statements that already exist.")
+
+    def handle(self, *args, **options):
+        as_of = timezone.localdate()
+        if options['date']:
+            try:
+                as_of = parse_date(options['date'])
+            except ValueError:  # well formed but not a real day, e.g. 2025-02-30
+                as_of = None
+            if as_of is None:
+                raise CommandError("--date must be YYYY-MM-DD.")
+        for name in ('chunk_size', 'task_size', 'workers'):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1.")
+
+        base_dir = options['output_dir'] or getattr(settings, 'STATEMENTS_ROOT', os.path.join(settings.BASE_DIR, 'statements'))
+        directory = os.path.join(base_dir, as_of.isoformat())
+        os.makedirs(directory, exist_ok=True)
+        done = set() if options['force'] else set(os.listdir(directory))
+
+        written = skipped = 0
+        pending = []
+        executor = ProcessPoolExecutor(max_workers=options['workers'], mp_context=multiprocessing.get_context('spawn'))
+        try:
+            for user_ids in self.iter_user_chunks(options['chunk_size']):
+                todo = [pk for pk in user_ids if statement_filename(pk) not in done]
+                skipped += len(user_ids) - len(todo)
+                if not todo:
+                    continue
+                records = self.load_records(todo)
+                for start in range(0, len(records), options['task_size']):
+                    pending.append(executor.submit(write_statements, records[start:start + options['task_size']], directory, as_of))
+                # Keep at most a couple of rounds in flight so memory stays bounded.
+                while len(pending) > options['workers'] * 2:
+                    written += pending.pop(0).result()
+            for future in pending:
+                written += future.result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written} statement(s) to {directory}, skipped {skipped} already present."
+        ))
+
+    def iter_user_chunks(self, chunk_size):
+        """Distinct investor user ids in ascending order, straight off the user_id index."""
+        last = 0
+        while True:
+            ids = list(
+                Investor.objects.filter(user_id__gt=last).order_by('user_id')
+                .values_list('user_id', flat=True).distinct()[:chunk_size]
+            )
+            if not ids:
+                return
+            last = ids[-1]
+            yield ids
+
+    def load_records(self, user_ids):
+        """[(user, positions), ...] for ``user_ids`` with three queries."""
+        users = {
+            row['id']: row
+            for row in User.objects.filter(pk__in=user_ids).values('id', 'name', 'mobile_number')
+        }
+        positions = {pk: [] for pk in users}
+        rows = (
+            Investor.objects.filter(user_id__in=user_ids)
+            .order_by('user_id', 'selected_service_group__name', 'investment_period')
+            .values(*POSITION_FIELDS, group_name=F('selected_service_group__name'))
+        )
+        rows = [row for row in rows if row['user_id'] in positions]
+        entries = ShareLedgerEntry.entries_by_investor([row['id'] for row in rows])
+        for row in rows:
+            row['tranches'] = open_tranches(entries.get(row['id'], []))
+            positions[row['user_id']].append(row)
+        return [(users[pk], positions[pk]) for pk in user_ids if pk in users]
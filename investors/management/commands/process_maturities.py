@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from investors.maturity import close_matured_batch, matured
+
+
+class Command(BaseCommand):
+    help = (
+        "Closes active investments whose end date has passed: freezes their accrued profit and "
+        "portfolio value, marks them inactive and sends investments_matured per batch. "
+        "Run daily (e.g. from cron); it picks up anything a missed run left behind."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Close investments that ended before this day, YYYY-MM-DD (default: today).")
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help="Investments closed per transaction (default: settings.INVESTOR_JOB_BATCH_SIZE).")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the matured investments.")
+
+    def handle(self, *args, **options):
+        as_of = timezone.localdate()
+        if options['date']:
+            try:
+                as_of = parse_date(options['date'])
+            except ValueError:  # well formed but not a real day, e.g. 2025-02-30
+                as_of = None
+            if as_of is None:
+                raise CommandError("--date must be YYYY-MM-DD.")
+            if as_of > timezone.localdate():
+                # Closing early would freeze investments that are still running.
+                raise CommandError("--date must not be in the future.")
+        batch_size = options['batch_size'] or getattr(settings, 'INVESTOR_JOB_BATCH_SIZE', 500)
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        if options['dry_run']:
+            self.stdout.write(f"{matured(as_of=as_of).count()} investment(s) ended before {as_of}.")
+            return
+
+        closed = 0
+        while True:
+            count = close_matured_batch(as_of=as_of, batch_size=batch_size)
+            if not count:
+                break
+            closed += count
+            self.stdout.write(f"Closed {closed} so far...")
+        self.stdout.write(self.style.SUCCESS(f"Closed {closed} matured investment(s)."))
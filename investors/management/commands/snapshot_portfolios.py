@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from investors.models import UserPortfolioSnapshot
+from investors.portfolio import snapshot_day
+
+
+class Command(BaseCommand):
+    help = (
+        "Records daily user and group portfolio snapshots. Run nightly: without --date it fills "
+        "every day since the last snapshot up to today."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Snapshot only this day, YYYY-MM-DD (re-runs overwrite it).")
+        parser.add_argument('--max-days', type=int, default=31,
+                            help="Most days to catch up in one run, oldest first (default: 31).")
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help="Users per read/upsert round (default: 2000).")
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['max_days'] < 1:
+            raise CommandError("--chunk-size and --max-days must be at least 1.")
+
+        today = timezone.localdate()
+        if options['date']:
+            try:
+                day = parse_date(options['date'])
+            except ValueError:  # well formed but not a real day, e.g. 2025-02-30
+                day = None
+            if day is None:
+                raise CommandError("--date must be YYYY-MM-DD.")
+            days = [day]
+        else:
+            last = UserPortfolioSnapshot.objects.aggregate(last=Max('date'))['last']
+            first = last + timedelta(days=1) if last else today
+            # Today is always refreshed so the chart's last point is current. A longer
+            # gap is filled oldest first, so the next run carries on where this one stopped.
+            first = min(first, today)
+            days = [first + timedelta(days=n) for n in range(min((today - first).days + 1, options['max_days']))]
+
+        for day in days:
+            users, groups = snapshot_day(day, chunk_size=options['chunk_size'])
+            self.stdout.write(f"{day}: {users} user snapshot(s), {groups} group snapshot(s)")
+        self.stdout.write(self.style.SUCCESS(f"Recorded {len(days)} day(s)."))
@@ -0,0 +1,59 @@
+# SHA_GROUP/investors/maturity.py
+"""
+Closing investments whose end date has passed.
+
+close_matured_batch takes the oldest matured active rows off the
+(is_investment_active, investment_end_date) index, freezes their accrued
+profit and portfolio value as of the end date, flips them inactive with one
+bulk UPDATE, and sends investments_matured for the whole batch once it has
+committed. Rows are locked (SKIP LOCKED where the database supports it), so
+overlapping runs don't process the same rows twice.
+"""
+from functools import partial
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Investor, ShareLedgerEntry
+from .signals import investments_matured
+from .valuation import open_tranches, project_tranches
+
+MATURITY_FIELDS = ['is_investment_active', 'matured_at', 'current_accrued_profit', 'total_portfolio_value', 'updated_at']
+VALUATION_FIELDS = ['interest_rate_applied', 'investment_period', 'investment_start_date', 'investment_end_date']
+
+
+def matured(queryset=None, as_of=None):
+    """Active investments (optionally within ``queryset``) whose end date is before ``as_of``."""
+    queryset = Investor.objects.all() if queryset is None else queryset
+    return queryset.filter(is_investment_active=True, investment_end_date__lt=as_of or timezone.localdate())
+
+
+def close_matured_batch(queryset=None, as_of=None, batch_size=500):
+    """Closes up to ``batch_size`` matured investments in one transaction. Returns how many."""
+    as_of = as_of or timezone.localdate()
+    with transaction.atomic():
+        batch = list(
+            matured(queryset, as_of).order_by('investment_end_date', 'pk')
+            .select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked).only('pk', *VALUATION_FIELDS)[:batch_size]
+        )
+        if not batch:
+            return 0
+        entries = ShareLedgerEntry.entries_by_investor([investor.pk for investor in batch])
+        now = timezone.now()
+        for investor in batch:
+            # Every end date is before as_of, so accrual runs to the end date: the final, frozen value.
+            values = project_tranches(
+                open_tranches(entries.get(investor.pk, [])), investor.interest_rate_applied, investor.investment_period,
+                investor.investment_start_date, as_of=as_of, end_date=investor.investment_end_date,
+            )
+            investor.is_investment_active = False
+            investor.matured_at = now
+            investor.current_accrued_profit = values['current_accrued_profit']
+            investor.total_portfolio_value = values['total_portfolio_value']
+            investor.updated_at = now
+        Investor.objects.bulk_update(batch, MATURITY_FIELDS)
+        transaction.on_commit(partial(
+            investments_matured.send, sender=Investor, investor_ids=[investor.pk for investor in batch], matured_at=now,
+        ))
+    return len(batch)
+
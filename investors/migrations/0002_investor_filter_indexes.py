@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='investor',
+            index=models.Index(fields=['selected_service_group', 'investment_period', 'is_investment_active', 'investment_end_date'], name='investor_group_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='investor',
+            index=models.Index(fields=['is_investment_active', 'investment_end_date'], name='investor_active_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='investor',
+            index=models.Index(fields=['investment_start_date'], name='investor_start_date_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-19 10:04
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0002_investor_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupPortfolioSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('investment_count', models.PositiveIntegerField(default=0)),
+                ('invested_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('accrued_profit', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('portfolio_value', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('service_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='portfolio_snapshots', to='investors.investmentservicegroup')),
+            ],
+            options={
+                'verbose_name': 'Group Portfolio Snapshot',
+                'verbose_name_plural': 'Group Portfolio Snapshots',
+                'ordering': ['service_group_id', 'date'],
+                'unique_together': {('service_group', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserPortfolioSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('investment_count', models.PositiveIntegerField(default=0)),
+                ('invested_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('accrued_profit', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('portfolio_value', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='portfolio_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Portfolio Snapshot',
+                'verbose_name_plural': 'User Portfolio Snapshots',
+                'ordering': ['user_id', 'date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.3 on 2026-10-19 10:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_existing_balances(apps, schema_editor):
+    """One opening entry per existing investment, so every balance is covered by the ledger."""
+    Investor = apps.get_model('investors', 'Investor')
+    ShareLedgerEntry = apps.get_model('investors', 'ShareLedgerEntry')
+    last_pk = 0
+    while True:
+        rows = list(
+            Investor.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', 'number_of_shares', 'invested_amount', 'selected_service_group__share_value',
+                         'investment_start_date', 'created_at')[:2000]
+        )
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        ShareLedgerEntry.objects.bulk_create([
+            ShareLedgerEntry(
+                investor_id=pk, kind='opening', shares=shares, amount=invested_amount,
+                share_value=share_value or Decimal('0.00'), effective_date=start_date or created_at.date(),
+            )
+            for pk, shares, invested_amount, share_value, start_date, created_at in rows
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0003_portfolio_snapshots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShareLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('opening', 'Opening balance'), ('purchase', 'Purchase'), ('redemption', 'Redemption'), ('adjustment', 'Adjustment')], max_length=16)),
+                ('shares', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('share_value', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=18)),
+                ('effective_date', models.DateField(default=django.utils.timezone.localdate)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('investor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='investors.investor')),
+            ],
+            options={
+                'verbose_name': 'Share Ledger Entry',
+                'verbose_name_plural': 'Share Ledger Entries',
+                'ordering': ['investor_id', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ShareBalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shares', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=18)),
+                ('entry_count', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('investor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_checkpoints', to='investors.investor')),
+                ('last_entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='investors.shareledgerentry')),
+            ],
+            options={
+                'verbose_name': 'Share Balance Checkpoint',
+                'verbose_name_plural': 'Share Balance Checkpoints',
+                'ordering': ['investor_id', 'last_entry_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='shareledgerentry',
+            index=models.Index(fields=['investor', 'id'], name='ledger_investor_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='sharebalancecheckpoint',
+            unique_together={('investor', 'last_entry')},
+        ),
+        migrations.RunPython(open_existing_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-19 10:15
+
+import django.core.validators
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0004_share_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='investmentservicegroup',
+            name='inventory_stripes',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Counter rows the remaining shares are spread over; raise it for groups with many concurrent buyers.', validators=[django.core.validators.MinValueValidator(1)], verbose_name='Inventory Stripes'),
+        ),
+        migrations.AddField(
+            model_name='investmentservicegroup',
+            name='share_capacity',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Total shares that can be held in this group. Leave empty for no limit.', max_digits=15, null=True, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))], verbose_name='Share Capacity'),
+        ),
+        migrations.CreateModel(
+            name='ShareInventoryStripe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stripe', models.PositiveSmallIntegerField()),
+                ('remaining', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('service_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='share_stripes', to='investors.investmentservicegroup')),
+            ],
+            options={
+                'verbose_name': 'Share Inventory Stripe',
+                'verbose_name_plural': 'Share Inventory Stripes',
+                'unique_together': {('service_group', 'stripe')},
+            },
+        ),
+    ]
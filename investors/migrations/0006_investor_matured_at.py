@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 10:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0005_share_inventory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='investor',
+            name='matured_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When maturity processing closed this investment; its values are frozen from then on.', null=True, verbose_name='Matured At'),
+        ),
+    ]
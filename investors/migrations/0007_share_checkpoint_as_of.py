@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+def drop_checkpoints(apps, schema_editor):
+    # Checkpoints keyed by entry id can't be converted to as_of dates; they only
+    # cache ledger sums, so checkpoint_share_ledger simply writes them again.
+    apps.get_model('investors', 'ShareBalanceCheckpoint').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('investors', '0006_investor_matured_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_checkpoints, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='sharebalancecheckpoint',
+            unique_together=set(),
+        ),
+        migrations.AlterModelOptions(
+            name='sharebalancecheckpoint',
+            options={'ordering': ['investor_id', 'as_of'], 'verbose_name': 'Share Balance Checkpoint', 'verbose_name_plural': 'Share Balance Checkpoints'},
+        ),
+        migrations.RemoveField(
+            model_name='sharebalancecheckpoint',
+            name='last_entry',
+        ),
+        migrations.AddField(
+            model_name='sharebalancecheckpoint',
+            name='as_of',
+            field=models.DateField(default='1970-01-01'),
+            preserve_default=False,
+        ),
+        migrations.AlterUniqueTogether(
+            name='sharebalancecheckpoint',
+            unique_together={('investor', 'as_of')},
+        ),
+        migrations.AddIndex(
+            model_name='shareledgerentry',
+            index=models.Index(fields=['investor', 'effective_date'], name='ledger_investor_date_idx'),
+        ),
+    ]
@@ -8,6 +8,7 @@ from django.utils import timezone
 from datetime import timedelta
 from decimal import Decimal
 from django.utils.translation import gettext_lazy as _
+from .valuation import open_tranches, project_tranches
 
 # Assuming User, InvestmentServiceGroup, and InterestRateSetting models are defined as before
 
@@ -20,6 +21,16 @@ class InvestmentServiceGroup(models.Model):
     name = models.CharField(max_length=255, unique=True)
     share_value = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'), validators=[MinValueValidator(Decimal('0.01'))])
     description = models.TextField(blank=True, null=True, verbose_name=_("Description"))
+    share_capacity = models.DecimalField(
+        max_digits=15, decimal_places=2, null=True, blank=True, validators=[MinValueValidator(Decimal('0.00'))],
+        verbose_name=_("Share Capacity"),
+        help_text=_("Total shares that can be held in this group. Leave empty for no limit."),
+    )
+    inventory_stripes = models.PositiveSmallIntegerField(
+        default=1, validators=[MinValueValidator(1)],
+        verbose_name=_("Inventory Stripes"),
+        help_text=_("Counter rows the remaining shares are spread over; raise it for groups with many concurrent buyers."),
+    )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -27,6 +38,25 @@ class InvestmentServiceGroup(models.Model):
     def __str__(self):
         return self.name
 
+
+class ShareInventoryStripe(models.Model):
+    """
+    One slice of a capped group's unallocated shares. Purchases decrement a
+    single stripe with a conditional UPDATE (see investors.inventory), so
+    concurrent buyers only wait for each other when they hit the same stripe.
+    """
+    service_group = models.ForeignKey(InvestmentServiceGroup, on_delete=models.CASCADE, related_name='share_stripes')
+    stripe = models.PositiveSmallIntegerField()
+    remaining = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = _("Share Inventory Stripe")
+        verbose_name_plural = _("Share Inventory Stripes")
+        unique_together = ('service_group', 'stripe')
+
+    def __str__(self):
+        return f"{self.service_group_id}/{self.stripe}: {self.remaining}"
+
 class InterestRateSetting(models.Model):
     service_group = models.ForeignKey(InvestmentServiceGroup, on_delete=models.CASCADE, related_name='interest_rates')
     period_in_years = models.PositiveIntegerField(choices=[(3, '3 Years'), (5, '5 Years'), (10, '10 Years')], unique=False)
@@ -115,6 +145,11 @@ class Investor(models.Model):
         default=True,
         verbose_name=_("Is Investment Active")
     )
+    matured_at = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        verbose_name=_("Matured At"),
+        help_text=_("When maturity processing closed this investment; its values are frozen from then on.")
+    )
     uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -124,6 +159,14 @@ class Investor(models.Model):
         verbose_name_plural = _("Investments")
         ordering = ['user__id', 'created_at'] # Ordering by user ID is safer than mobile_number if not unique
         unique_together = ('user', 'selected_service_group', 'investment_period')
+        indexes = [
+            # Staff filters on InvestorViewSet (see investors.filters): group/period/active with an end date range,
+            # the active flag with an end date range (also what maturity processing scans), and start date ranges.
+            models.Index(fields=['selected_service_group', 'investment_period', 'is_investment_active', 'investment_end_date'],
+                         name='investor_group_period_idx'),
+            models.Index(fields=['is_investment_active', 'investment_end_date'], name='investor_active_end_idx'),
+            models.Index(fields=['investment_start_date'], name='investor_start_date_idx'),
+        ]
 
     def __str__(self):
         user_info = self.user.get_full_name() if hasattr(self.user, 'get_full_name') and self.user.get_full_name() else str(self.user)
@@ -132,19 +175,14 @@ class Investor(models.Model):
 
     # MARK: Calculation Method
     def calculate_derived_fields(self):
-        # 1. Recalculate invested_amount (Principal) based on current shares and group share_value
+        # The math itself lives in investors.valuation; this only picks the active rate.
+        if self.matured_at:
+            return # Closed by investors.maturity; keep the values frozen at maturity
         share_value = self.selected_service_group.share_value if self.selected_service_group else Decimal('0.00')
-        self.invested_amount = (self.number_of_shares * share_value).quantize(Decimal('0.01'))
-
-        # Initialize all derived fields to default values before calculation
-        self.interest_rate_applied = Decimal('0.0000')
-        self.final_return_amount = self.invested_amount
-        self.profit = Decimal('0.00') # This is the *projected* profit at maturity
-        self.current_accrued_profit = Decimal('0.00') # NEW FIELD: Profit earned up to the current date
-        self.total_portfolio_value = self.invested_amount # NEW: Current total portfolio value (principal + accrued)
-        self.investment_end_date = None
+        invested_amount = (self.number_of_shares * share_value).quantize(Decimal('0.01'))
 
-        if self.invested_amount > 0 and \
+        interest_percentage = None
+        if invested_amount > 0 and \
            self.investment_period is not None and \
            self.selected_service_group:
             try:
@@ -153,84 +191,164 @@ class Investor(models.Model):
                     period_in_years=self.investment_period,
                     is_active=True # Ensure only active rate settings are used
                 )
-                self.interest_rate_applied = interest_setting.interest_percentage
-
-                rate_decimal = self.interest_rate_applied / Decimal('100.00')
-
-                # Calculate projected final return (Simple Interest: A = P(1 + RT))
-                self.final_return_amount = self.invested_amount * (Decimal('1.00') + (rate_decimal * self.investment_period))
-                self.final_return_amount = self.final_return_amount.quantize(Decimal('0.01'))
-
-                # Projected profit at maturity (total profit for the full term)
-                self.profit = self.final_return_amount - self.invested_amount
-                self.profit = self.profit.quantize(Decimal('0.01'))
-
-                # Calculate investment end date
-                if self.investment_start_date:
-                    self.investment_end_date = self.investment_start_date + timedelta(days=int(self.investment_period * 365.25))
-
-                # --- Calculate Current Accrued Profit ---
-                # This profit is what's earned up to the current date, not the full projected amount
-                if self.is_investment_active and self.investment_start_date:
-                    current_date = timezone.now().date() # Use .date() because investment_start_date is a DateField
-
-                    # Ensure we don't calculate profit beyond the projected end date
-                    effective_calculation_date = current_date
-                    if self.investment_end_date and current_date > self.investment_end_date:
-                        effective_calculation_date = self.investment_end_date
-                    
-                    # Calculate days elapsed (ensure positive or zero)
-                    time_elapsed = effective_calculation_date - self.investment_start_date
-                    days_elapsed = max(0, time_elapsed.days)
-
-                    if days_elapsed > 0:
-                        # Simple interest accrued: P * R * (T_days / 365.25)
-                        profit_calc = self.invested_amount * rate_decimal * (Decimal(str(days_elapsed)) / Decimal('365.25'))
-                        self.current_accrued_profit = profit_calc.quantize(Decimal('0.01'))
-                    else:
-                        self.current_accrued_profit = Decimal('0.00')
-                else: # If investment is not active or no start date, accrued profit is 0
-                    self.current_accrued_profit = Decimal('0.00')
-
-                # --- Set total_portfolio_value to reflect current value (principal + accrued profit) ---
-                self.total_portfolio_value = self.invested_amount + self.current_accrued_profit
-                self.total_portfolio_value = self.total_portfolio_value.quantize(Decimal('0.01'))
-
-
+                interest_percentage = interest_setting.interest_percentage
             except InterestRateSetting.DoesNotExist:
                 # Fallback if no specific interest rate setting is found
                 print(f"--- WARNING: No active InterestRateSetting found for Group '{self.selected_service_group.name}', Period {self.investment_period} years. Profit/Return set to 0. ---")
-                self.final_return_amount = self.invested_amount
-                self.profit = Decimal('0.00')
-                self.current_accrued_profit = Decimal('0.00')
-                self.total_portfolio_value = self.invested_amount
-                self.interest_rate_applied = Decimal('0.0000')
-                self.investment_end_date = None
             except Exception as e:
                 # Catch any other unexpected errors during calculation
                 print(f"--- ERROR in calculate_derived_fields for Investor {self.pk}: {e} ---")
-                self.final_return_amount = self.invested_amount
-                self.profit = Decimal('0.00')
-                self.current_accrued_profit = Decimal('0.00')
-                self.total_portfolio_value = self.invested_amount
-                self.interest_rate_applied = Decimal('0.0000')
-                self.investment_end_date = None
-        else:
-            # If fundamental conditions for calculation are not met (e.g., shares=0 or group missing)
-            self.final_return_amount = self.invested_amount
-            self.profit = Decimal('0.00')
-            self.current_accrued_profit = Decimal('0.00')
-            self.total_portfolio_value = self.invested_amount
-            self.interest_rate_applied = Decimal('0.0000')
-            self.investment_end_date = None
-
-        # Ensure all Decimal fields are correctly rounded for storage
-        self.invested_amount = self.invested_amount.quantize(Decimal('0.01'))
-        self.final_return_amount = self.final_return_amount.quantize(Decimal('0.01'))
-        self.profit = self.profit.quantize(Decimal('0.01'))
-        self.current_accrued_profit = self.current_accrued_profit.quantize(Decimal('0.01'))
-        self.total_portfolio_value = self.total_portfolio_value.quantize(Decimal('0.01'))
-        self.interest_rate_applied = self.interest_rate_applied.quantize(Decimal('0.0000'))
+
+        # Shares accrue per ledger tranche, from the day they were bought (see investors.ledger).
+        today = timezone.now().date() # Use .date() because investment_start_date is a DateField
+        entries = ShareLedgerEntry.entries_by_investor([self.pk]).get(self.pk, []) if self.pk else []
+        # A plain save() changing the balance is recorded after this runs (investors.ledger.record_share_changes),
+        # as an entry dated today, or the start date for a new investment.
+        difference = self.number_of_shares - sum(shares for _, shares, _ in entries)
+        if difference:
+            entries.append((today if entries else self.investment_start_date, difference, share_value))
+        values = project_tranches(
+            open_tranches(entries), interest_percentage, self.investment_period,
+            start_date=self.investment_start_date,
+            as_of=today,
+            is_active=self.is_investment_active,
+        )
+        for field_name, value in values.items():
+            setattr(self, field_name, value)
+
+
+# MARK: Share Ledger
+class ShareLedgerEntry(models.Model):
+    """
+    One change to an investment's share balance. Entries are only ever
+    appended; Investor.number_of_shares is the running total they are applied
+    to (see investors.ledger). ``shares`` and ``amount`` are signed:
+    redemptions and downward adjustments are negative.
+    """
+    KIND_OPENING = 'opening'
+    KIND_PURCHASE = 'purchase'
+    KIND_REDEMPTION = 'redemption'
+    KIND_ADJUSTMENT = 'adjustment'
+    KIND_CHOICES = [
+        (KIND_OPENING, _("Opening balance")),
+        (KIND_PURCHASE, _("Purchase")),
+        (KIND_REDEMPTION, _("Redemption")),
+        (KIND_ADJUSTMENT, _("Adjustment")),
+    ]
+
+    investor = models.ForeignKey(Investor, on_delete=models.CASCADE, related_name='ledger_entries')
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    shares = models.DecimalField(max_digits=15, decimal_places=2)
+    share_value = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    effective_date = models.DateField(default=timezone.localdate)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Share Ledger Entry")
+        verbose_name_plural = _("Share Ledger Entries")
+        ordering = ['investor_id', 'id']
+        indexes = [
+            models.Index(fields=['investor', 'id'], name='ledger_investor_idx'),
+            # shares_as_of and the checkpoints read an investor's entries by effective date.
+            models.Index(fields=['investor', 'effective_date'], name='ledger_investor_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} of {self.shares} shares on investment {self.investor_id}"
+
+    @classmethod
+    def entries_by_investor(cls, investor_ids, day=None):
+        """
+        {investor_id: [(effective_date, shares, share_value), ...]} with the
+        entries of ``investor_ids`` (dated up to ``day``, if given) in the
+        order they apply, read with one query.
+        """
+        entries = cls.objects.filter(investor_id__in=investor_ids)
+        if day is not None:
+            entries = entries.filter(effective_date__lte=day)
+        by_investor = {}
+        for investor_id, *entry in entries.order_by('investor_id', 'effective_date', 'id').values_list(
+                'investor_id', 'effective_date', 'shares', 'share_value'):
+            by_investor.setdefault(investor_id, []).append(tuple(entry))
+        return by_investor
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Share ledger entries are append-only.")
+        super().save(*args, **kwargs)
+
+
+class ShareBalanceCheckpoint(models.Model):
+    """
+    The share balance of an investment from every ledger entry with an
+    effective_date up to ``as_of``, written by the checkpoint_share_ledger
+    command once LEDGER_CHECKPOINT_INTERVAL entries have accumulated.
+    ``as_of`` trails today by LEDGER_CHECKPOINT_LAG_DAYS, so no entry still
+    in flight can land in a range a checkpoint already covers. Any historical
+    balance is the nearest earlier checkpoint plus the few entries after it.
+    """
+    investor = models.ForeignKey(Investor, on_delete=models.CASCADE, related_name='balance_checkpoints')
+    as_of = models.DateField()
+    shares = models.DecimalField(max_digits=15, decimal_places=2)
+    amount = models.DecimalField(max_digits=18, decimal_places=2)
+    entry_count = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Share Balance Checkpoint")
+        verbose_name_plural = _("Share Balance Checkpoints")
+        unique_together = ('investor', 'as_of')
+        ordering = ['investor_id', 'as_of']
+
+    def __str__(self):
+        return f"{self.investor_id} as of {self.as_of}: {self.shares} shares"
+
+
+# MARK: Portfolio Snapshots
+class UserPortfolioSnapshot(models.Model):
+    """
+    One user's active portfolio totals at the end of one day, written by the
+    snapshot_portfolios command. Charts read a date range for one user, which
+    is a range scan on the (user, date) unique index.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='portfolio_snapshots')
+    date = models.DateField()
+    investment_count = models.PositiveIntegerField(default=0)
+    invested_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    accrued_profit = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    portfolio_value = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = _("User Portfolio Snapshot")
+        verbose_name_plural = _("User Portfolio Snapshots")
+        unique_together = ('user', 'date')
+        ordering = ['user_id', 'date']
+
+    def __str__(self):
+        return f"{self.user_id} @ {self.date}: {self.portfolio_value}"
+
+
+class GroupPortfolioSnapshot(models.Model):
+    """Active totals of one service group at the end of one day (see UserPortfolioSnapshot)."""
+    service_group = models.ForeignKey(InvestmentServiceGroup, on_delete=models.CASCADE, related_name='portfolio_snapshots')
+    date = models.DateField()
+    investment_count = models.PositiveIntegerField(default=0)
+    invested_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    accrued_profit = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+    portfolio_value = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        verbose_name = _("Group Portfolio Snapshot")
+        verbose_name_plural = _("Group Portfolio Snapshots")
+        unique_together = ('service_group', 'date')
+        ordering = ['service_group_id', 'date']
+
+    def __str__(self):
+        return f"{self.service_group_id} @ {self.date}: {self.portfolio_value}"
 
 
 # MARK: Pre-Save Signal Receiver
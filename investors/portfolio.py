@@ -0,0 +1,118 @@
+# SHA_GROUP/investors/portfolio.py
+"""
+Daily portfolio snapshots and the downsampling used to chart them.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+
+from sha.utils import bulk_upsert
+from .models import GroupPortfolioSnapshot, Investor, ShareLedgerEntry, UserPortfolioSnapshot
+from .valuation import from_units, open_tranches, project_tranches, to_units
+
+SNAPSHOT_VALUE_FIELDS = ['investment_count', 'invested_amount', 'accrued_profit', 'portfolio_value']
+RESOLUTIONS = ('day', 'week', 'month')
+
+
+def _empty_totals():
+    # [investment_count, invested cents, accrued cents]
+    return [0, 0, 0]
+
+
+def _add_position(totals, values):
+    totals[0] += 1
+    totals[1] += to_units(values['invested_amount'])
+    totals[2] += to_units(values['current_accrued_profit'])
+
+
+def _snapshot(model, totals, **kwargs):
+    count, invested, accrued = totals
+    return model(
+        investment_count=count, invested_amount=from_units(invested), accrued_profit=from_units(accrued),
+        portfolio_value=from_units(invested + accrued), **kwargs,
+    )
+
+
+#MARK: Snapshot
+def snapshot_day(as_of, chunk_size=2000):
+    """
+    Writes the user and group snapshots for ``as_of`` from the active book.
+    Positions are read in user-id ordered chunks, with their share ledger
+    entries up to that day; each chunk's users are
+    upserted with one bulk statement, group totals once at the end.
+    Re-running a day overwrites it. Returns (users, groups) written.
+    """
+    positions = Investor.objects.filter(is_investment_active=True, investment_start_date__lte=as_of)
+    fields = ['pk', 'user_id', 'selected_service_group_id', 'interest_rate_applied',
+              'investment_period', 'investment_start_date', 'investment_end_date']
+
+    group_totals = defaultdict(_empty_totals)
+    users_written = 0
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            positions.filter(user_id__gt=last_user_id).order_by('user_id')
+            .values_list('user_id', flat=True).distinct()[:chunk_size]
+        )
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+
+        rows = list(positions.filter(user_id__in=user_ids).values_list(*fields))
+        entries = ShareLedgerEntry.entries_by_investor([row[0] for row in rows], day=as_of)
+        user_totals = defaultdict(_empty_totals)
+        for pk, user_id, group_id, rate, period, start, end in rows:
+            values = project_tranches(open_tranches(entries.get(pk, [])), rate, period, start, as_of, end_date=end)
+            _add_position(user_totals[user_id], values)
+            if group_id:
+                _add_position(group_totals[group_id], values)
+
+        snapshots = [
+            _snapshot(UserPortfolioSnapshot, totals, user_id=user_id, date=as_of)
+            for user_id, totals in user_totals.items()
+        ]
+        with transaction.atomic():
+            bulk_upsert(UserPortfolioSnapshot, snapshots, ['user', 'date'], SNAPSHOT_VALUE_FIELDS)
+        users_written += len(snapshots)
+
+    with transaction.atomic():
+        bulk_upsert(
+            GroupPortfolioSnapshot,
+            [
+                _snapshot(GroupPortfolioSnapshot, totals, service_group_id=group_id, date=as_of)
+                for group_id, totals in group_totals.items()
+            ],
+            ['service_group', 'date'], SNAPSHOT_VALUE_FIELDS,
+        )
+    return users_written, len(group_totals)
+
+
+#MARK: Downsample
+def bucket_start(day, resolution):
+    if resolution == 'week':
+        return day - timedelta(days=day.weekday())
+    if resolution == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def downsample(rows, resolution):
+    """
+    Collapses date-ordered snapshot rows to one point per day/week/month.
+    Values are levels, not flows, so each bucket reports its last day.
+    """
+    points = {}
+    for row in rows:
+        points[bucket_start(row['date'], resolution)] = row
+    return [
+        {
+            'date': start,
+            'as_of': row['date'],
+            'investment_count': row['investment_count'],
+            'invested_amount': str(row['invested_amount']),
+            'accrued_profit': str(row['accrued_profit']),
+            'portfolio_value': str(row['portfolio_value']),
+        }
+        for start, row in points.items()
+    ]
@@ -0,0 +1,96 @@
+# SHA_GROUP/investors/quotes.py
+"""
+What-if quotes served from an in-memory (group x period) rate matrix.
+
+The matrix is loaded with two queries and kept per process. Saving or
+deleting a group or rate setting drops it (see InvestorsConfig.ready), and
+it also expires after settings.RATE_MATRIX_TTL seconds so other worker
+processes pick up catalog changes made elsewhere.
+"""
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import InterestRateSetting, InvestmentServiceGroup
+from .valuation import project_investment
+
+GroupRates = namedtuple('GroupRates', 'id name share_value rates')
+
+_matrix = None
+_matrix_loaded_at = 0.0
+_matrix_lock = threading.Lock()
+
+
+def load_rate_matrix():
+    """{group_id: GroupRates} for active groups, with their active rates keyed by period."""
+    matrix = {
+        pk: GroupRates(pk, name, share_value, {})
+        for pk, name, share_value in InvestmentServiceGroup.objects.filter(is_active=True)
+        .order_by('name').values_list('id', 'name', 'share_value')
+    }
+    for group_id, period, rate in InterestRateSetting.objects.filter(
+        is_active=True, service_group__is_active=True,
+    ).values_list('service_group_id', 'period_in_years', 'interest_percentage'):
+        if group_id in matrix:
+            matrix[group_id].rates[period] = rate
+    return matrix
+
+
+def get_rate_matrix():
+    global _matrix, _matrix_loaded_at
+    ttl = getattr(settings, 'RATE_MATRIX_TTL', 300)
+    matrix = _matrix
+    if matrix is not None and time.monotonic() - _matrix_loaded_at < ttl:
+        return matrix
+    with _matrix_lock:
+        if _matrix is None or time.monotonic() - _matrix_loaded_at >= ttl:
+            _matrix = load_rate_matrix()
+            _matrix_loaded_at = time.monotonic()
+        return _matrix
+
+
+def _drop_rate_matrix():
+    global _matrix
+    _matrix = None
+
+
+def invalidate_rate_matrix(**kwargs):
+    """Signal receiver: the next quote reloads the catalog (again once the change is committed)."""
+    _drop_rate_matrix()
+    transaction.on_commit(_drop_rate_matrix, using=kwargs.get('using'))
+
+
+#MARK: Quote
+def quote(number_of_shares, group_ids=None, periods=None, start_date=None):
+    """
+    Projected values of buying ``number_of_shares`` in every active
+    (group, period) cell, optionally narrowed to ``group_ids``/``periods``.
+    Uses the same math as Investor.calculate_derived_fields, without a query.
+    """
+    start_date = start_date or timezone.localdate()
+    quotes = []
+    for group in get_rate_matrix().values():
+        if group_ids and group.id not in group_ids:
+            continue
+        for period, rate in sorted(group.rates.items()):
+            if periods and period not in periods:
+                continue
+            values = project_investment(number_of_shares, group.share_value, rate, period, start_date=start_date)
+            quotes.append({
+                'service_group_id': group.id,
+                'service_group_name': group.name,
+                'share_value': str(group.share_value),
+                'investment_period': period,
+                'number_of_shares': str(number_of_shares),
+                'invested_amount': str(values['invested_amount']),
+                'interest_rate_applied': str(values['interest_rate_applied']),
+                'final_return_amount': str(values['final_return_amount']),
+                'profit': str(values['profit']),
+                'investment_start_date': start_date,
+                'investment_end_date': values['investment_end_date'],
+            })
+    return quotes
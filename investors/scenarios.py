@@ -0,0 +1,194 @@
+# SHA_GROUP/investors/scenarios.py
+"""
+Rate and share-value shock scenarios over the open investment book.
+
+The active positions are read once into NumPy column arrays (kept per
+process for settings.SCENARIO_BOOK_TTL seconds) and every scenario is
+evaluated on those arrays with vectorized code, so live rows are never
+touched and repeated what-ifs don't go back to the database.
+
+Projected payouts use the simple-interest formula of investors.valuation in
+float64 and are rounded to cents per cell; baseline and scenario go through
+the same path, so deltas are not polluted by rounding differences.
+"""
+import threading
+import time
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from sha.utils import iter_values_list
+from .models import InvestmentServiceGroup, Investor
+
+PERIODS = (3, 5, 10)
+BOOK_FIELDS = ['selected_service_group_id', 'investment_period', 'invested_amount', 'interest_rate_applied']
+LOAD_BLOCK_SIZE = 100000  # rows converted to arrays at a time while loading
+
+_book = None
+_book_lock = threading.Lock()
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImproperlyConfigured("numpy is required for scenario simulation: pip install numpy")
+    return numpy
+
+
+#MARK: Book
+class ScenarioBook:
+    """The open book as parallel arrays, one element per active position."""
+
+    def __init__(self, group_ids, periods, principal, rates, group_names):
+        np = _numpy()
+        self.loaded_at = timezone.now()
+        self.loaded_monotonic = time.monotonic()
+        self.group_names = group_names
+        self.group_ids, group_codes = np.unique(group_ids, return_inverse=True)
+        period_codes = np.searchsorted(PERIODS, periods)
+        # One cell per (group, period); cell = group_code * len(PERIODS) + period_code.
+        self.cells = (group_codes * len(PERIODS) + period_codes).astype(np.int64)
+        self.cell_count = len(self.group_ids) * len(PERIODS)
+        self.periods = periods.astype(np.float64)
+        self.principal = principal
+        self.rates = rates
+
+    def __len__(self):
+        return len(self.cells)
+
+    @classmethod
+    def load(cls, chunk_size=5000):
+        np = _numpy()
+        rows = iter_values_list(
+            Investor.objects.filter(is_investment_active=True, selected_service_group__isnull=False,
+                                    investment_period__in=PERIODS),
+            BOOK_FIELDS, chunk_size,
+        )
+        parts = []
+        while True:
+            block = list(islice(rows, LOAD_BLOCK_SIZE))
+            if not block:
+                break
+            group_ids, periods, principal, rates = zip(*block)
+            parts.append((
+                np.array(group_ids, dtype=np.int64), np.array(periods, dtype=np.int64),
+                np.array(principal, dtype=np.float64), np.array(rates, dtype=np.float64),
+            ))
+        if parts:
+            columns = [np.concatenate(column) for column in zip(*parts)]
+        else:
+            columns = [np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)]
+        group_names = dict(InvestmentServiceGroup.objects.values_list('id', 'name'))
+        return cls(*columns, group_names)
+
+    def _cell_index(self, group_id, period):
+        """Indices of the cells a shock addresses; None matches every group or period."""
+        np = _numpy()
+        groups = range(len(self.group_ids)) if group_id is None else np.flatnonzero(self.group_ids == group_id)
+        periods = range(len(PERIODS)) if period is None else [PERIODS.index(period)]
+        return [group * len(PERIODS) + code for group in groups for code in periods]
+
+    def run(self, shocks):
+        """
+        Applies ``shocks`` (see parse_shocks) and returns per-group results,
+        each with a per-period breakdown of positions, invested amount and
+        projected payouts at maturity before and after the shocks.
+        """
+        np = _numpy()
+        rate_shift = np.zeros(self.cell_count)
+        value_factor = np.ones(self.cell_count)
+        for shock in shocks:
+            index = self._cell_index(shock['group'], shock['period'])
+            rate_shift[index] += shock['rate_bp'] / 100
+            value_factor[index] *= 1 + shock['share_value_pct'] / 100
+
+        baseline = self.principal * (1 + self.rates / 100 * self.periods)
+        shocked_rates = np.maximum(self.rates + rate_shift[self.cells], 0)
+        shocked_principal = self.principal * value_factor[self.cells]
+        scenario = shocked_principal * (1 + shocked_rates / 100 * self.periods)
+
+        def per_cell(weights=None):
+            return np.bincount(self.cells, weights=weights, minlength=self.cell_count).reshape(-1, len(PERIODS))
+
+        counts = per_cell()
+        invested, baseline_payout, scenario_payout = (
+            np.round(per_cell(values), 2) for values in (self.principal, baseline, scenario)
+        )
+
+        results = []
+        for code, group_id in enumerate(self.group_ids.tolist()):
+            cells = [
+                _amounts(
+                    {'investment_period': period, 'positions': int(counts[code, p])},
+                    invested[code, p], baseline_payout[code, p], scenario_payout[code, p],
+                )
+                for p, period in enumerate(PERIODS) if counts[code, p]
+            ]
+            results.append(_amounts(
+                {
+                    'service_group_id': group_id,
+                    'service_group_name': self.group_names.get(group_id),
+                    'positions': int(counts[code].sum()),
+                },
+                invested[code].sum(), baseline_payout[code].sum(), scenario_payout[code].sum(),
+                periods=cells,
+            ))
+        return results
+
+
+def _amounts(entry, invested, baseline, scenario, **extra):
+    entry.update(
+        invested_amount=f"{invested:.2f}",
+        baseline_payout=f"{baseline:.2f}",
+        scenario_payout=f"{scenario:.2f}",
+        payout_delta=f"{scenario - baseline:.2f}",
+        **extra,
+    )
+    return entry
+
+
+def get_book(refresh=False):
+    """The cached ScenarioBook, (re)loaded when older than SCENARIO_BOOK_TTL or on ``refresh``."""
+    global _book
+    ttl = getattr(settings, 'SCENARIO_BOOK_TTL', 600)
+    with _book_lock:
+        if refresh or _book is None or time.monotonic() - _book.loaded_monotonic >= ttl:
+            _book = ScenarioBook.load()
+        return _book
+
+
+#MARK: Shocks
+def parse_shocks(data):
+    """
+    Validates a list of shocks, each {"group": id or null, "period": 3/5/10 or
+    null, "rate_bp": additive change in basis points, "share_value_pct":
+    relative change of the share value in percent}. A null group or period
+    applies the shock to all of them. Raises ValueError with a message.
+    """
+    if not isinstance(data, list) or not data:
+        raise ValueError("shocks must be a non-empty list.")
+    if len(data) > 200:
+        raise ValueError("At most 200 shocks per scenario.")
+    shocks = []
+    for shock in data:
+        if not isinstance(shock, dict):
+            raise ValueError("Each shock must be an object.")
+        group, period = shock.get('group'), shock.get('period')
+        if group is not None and (not isinstance(group, int) or isinstance(group, bool)):
+            raise ValueError("group must be a service group id or null.")
+        if period is not None and period not in PERIODS:
+            raise ValueError(f"period must be one of {', '.join(map(str, PERIODS))} or null.")
+        try:
+            rate_bp = float(shock.get('rate_bp', 0))
+            share_value_pct = float(shock.get('share_value_pct', 0))
+        except (TypeError, ValueError):
+            raise ValueError("rate_bp and share_value_pct must be numbers.")
+        if not -10000 <= rate_bp <= 10000:
+            raise ValueError("rate_bp must be between -10000 and 10000.")
+        if not -100 <= share_value_pct <= 1000:
+            raise ValueError("share_value_pct must be between -100 and 1000.")
+        shocks.append({'group': group, 'period': period, 'rate_bp': rate_bp, 'share_value_pct': share_value_pct})
+    return shocks
@@ -1,7 +1,7 @@
 # SHA_GROUP/investor/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Investor, InvestmentServiceGroup, InterestRateSetting
+from .models import Investor, InvestmentServiceGroup, InterestRateSetting, ShareLedgerEntry
 from decimal import Decimal
 
 User = get_user_model()
@@ -10,7 +10,7 @@ class InvestmentServiceGroupSerializer(serializers.ModelSerializer):
     class Meta:
         model = InvestmentServiceGroup
         # fields = '__all__'
-        fields = ['id', 'name', 'share_value', 'description', 'is_active', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'share_value', 'description', 'share_capacity', 'inventory_stripes', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ('created_at', 'updated_at')
 #MARK: Interest Rate Setting Serializer
 class InterestRateSettingSerializer(serializers.ModelSerializer):
@@ -88,3 +88,14 @@ class InvestorSerializer(serializers.ModelSerializer):
         if value not in [3, 5, 10]:
             raise serializers.ValidationError("Investment period must be 3, 5, or 10 years.")
         return value
+#MARK: Share Ledger Serializers
+class ShareLedgerEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ShareLedgerEntry
+        fields = ['id', 'kind', 'shares', 'share_value', 'amount', 'effective_date', 'created_at']
+        read_only_fields = fields
+
+
+class ShareTransactionSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=[ShareLedgerEntry.KIND_PURCHASE, ShareLedgerEntry.KIND_REDEMPTION])
+    number_of_shares = serializers.DecimalField(max_digits=15, decimal_places=2, min_value=Decimal('0.01'))
@@ -0,0 +1,6 @@
+# SHA_GROUP/investors/signals.py
+from django.dispatch import Signal
+
+# Sent once per batch by investors.maturity after the batch commits, with
+# sender=Investor, investor_ids=[...] and matured_at (the batch's timestamp).
+investments_matured = Signal()
@@ -0,0 +1,118 @@
+# SHA_GROUP/investors/statements.py
+"""
+Investor statement rendering.
+
+Everything here works on plain dicts and writes files itself, with no ORM or
+settings access, so generate_statements can fan it out to a process pool.
+"""
+import html
+import os
+from decimal import Decimal
+
+from .valuation import project_tranches
+
+def _money(value):
+    return f"{value:,.2f}"
+
+
+def _date(value):
+    return value.strftime('%d %b %Y') if value else '-'
+
+
+POSITION_ROW = (
+    "<tr><td>{group}</td><td>{period} years</td><td class=\"num\">{shares}</td>"
+    "<td class=\"num\">{invested}</td><td class=\"num\">{rate}%</td><td>{start}</td><td>{end}</td>"
+    "<td class=\"num\">{accrued}</td><td class=\"num\">{final}</td><td>{status}</td></tr>"
+)
+
+STATEMENT_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Investment statement - {name}</title>
+<style>
+body {{ font-family: Arial, Helvetica, sans-serif; font-size: 13px; color: #222; margin: 32px; }}
+h1 {{ font-size: 20px; margin-bottom: 4px; }}
+table {{ border-collapse: collapse; width: 100%; margin-top: 16px; }}
+th, td {{ border-bottom: 1px solid #ddd; padding: 6px 8px; text-align: left; }}
+th {{ background: #f4f4f4; }}
+.num {{ text-align: right; }}
+.totals td {{ font-weight: bold; }}
+</style>
+</head>
+<body>
+<h1>Investment statement</h1>
+<p>{name} &middot; {mobile_number}<br>Statement date: {as_of}</p>
+<table>
+<thead><tr><th>Service group</th><th>Period</th><th class="num">Shares</th><th class="num">Invested (AED)</th>
+<th class="num">Rate</th><th>Start</th><th>Maturity</th><th class="num">Accrued profit (AED)</th>
+<th class="num">Value at maturity (AED)</th><th>Status</th></tr></thead>
+<tbody>
+{rows}
+</tbody>
+<tfoot><tr class="totals"><td colspan="3">Total</td><td class="num">{total_invested}</td><td colspan="3"></td>
+<td class="num">{total_accrued}</td><td class="num">{total_final}</td><td></td></tr></tfoot>
+</table>
+<p>Portfolio value as of {as_of}: AED {portfolio_value}</p>
+</body>
+</html>
+"""
+
+
+#MARK: Render
+def render_statement(user, positions, as_of):
+    """
+    HTML statement for one user. ``user`` has name and mobile_number,
+    ``positions`` are dicts of Investor column values plus ``group_name``
+    and the open ``tranches`` of the investment (see valuation.open_tranches).
+    """
+    rows = []
+    total_invested = total_accrued = total_final = Decimal('0.00')
+    for position in positions:
+        accrued = project_tranches(
+            position['tranches'], position['interest_rate_applied'], position['investment_period'],
+            position['investment_start_date'], as_of, position['is_investment_active'], position['investment_end_date'],
+        )['current_accrued_profit']
+        total_invested += position['invested_amount']
+        total_accrued += accrued
+        total_final += position['final_return_amount']
+        rows.append(POSITION_ROW.format(
+            group=html.escape(position['group_name'] or '-'),
+            period=position['investment_period'],
+            shares=position['number_of_shares'],
+            invested=_money(position['invested_amount']),
+            rate=position['interest_rate_applied'].normalize(),
+            start=_date(position['investment_start_date']),
+            end=_date(position['investment_end_date']),
+            accrued=_money(accrued),
+            final=_money(position['final_return_amount']),
+            status='Active' if position['is_investment_active'] else 'Closed',
+        ))
+    return STATEMENT_TEMPLATE.format(
+        name=html.escape(user['name'] or user['mobile_number'] or ''),
+        mobile_number=html.escape(user['mobile_number'] or ''),
+        as_of=_date(as_of),
+        rows='\n'.join(rows),
+        total_invested=_money(total_invested),
+        total_accrued=_money(total_accrued),
+        total_final=_money(total_final),
+        portfolio_value=_money(total_invested + total_accrued),
+    )
+
+
+def statement_filename(user_id):
+    return f"statement-{user_id}.html"
+
+
+def write_statements(batch, directory, as_of):
+    """
+    Renders and writes the statements of ``batch`` ([(user, positions), ...])
+    into ``directory``. Each file is written under a temporary name and then
+    renamed, so a file that exists is always complete. Returns the count.
+    """
+    for user, positions in batch:
+        path = os.path.join(directory, statement_filename(user['id']))
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(render_statement(user, positions, as_of))
+        os.replace(path + '.tmp', path)
+    return len(batch)
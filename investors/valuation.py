@@ -0,0 +1,290 @@
+# SHA_GROUP/investors/valuation.py
+"""
+Simple-interest valuation of investment positions, free of the ORM.
+
+value_positions is the kernel: it takes a batch of Position records and
+one as-of date and works in integer minor units (cents, and ten-thousandths
+of a percent for rates). The rounding reproduces the Decimal formulas the
+model has always used, including the 28 digit context precision of the
+day-count division, so results are identical to the cent.
+
+Investor.calculate_derived_fields, the recalculation job, quotes, statements
+and portfolio snapshots all value positions through this module. An
+investment whose shares were bought at different dates is valued per
+tranche (project_tranches), each tranche accruing from its own date.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+CENT = Decimal('0.01')
+RATE_PLACES = Decimal('0.0000')
+DAYS_PER_YEAR = Decimal('365.25')
+
+MONEY_PLACES = 2  # amounts are integer cents
+RATE_UNIT_PLACES = 4  # rates are integer ten-thousandths of a percent
+_PRECISION = 28  # decimal.DefaultContext precision of the original Decimal formulas
+_PRECISION_LIMIT = 10 ** _PRECISION
+_RATE_ONE = 10 ** (RATE_UNIT_PLACES + 2)  # 100% expressed in rate units
+_PRODUCT_EXPONENT = -(MONEY_PLACES + RATE_UNIT_PLACES + 2)  # cents x rate units / 100%
+
+
+def investment_end_date(start_date, period_in_years):
+    if not start_date or period_in_years is None:
+        return None
+    return start_date + timedelta(days=int(period_in_years * 365.25))
+
+
+#MARK: Units
+def to_units(value, places=MONEY_PLACES):
+    """Decimal -> integer count of 10**-places units. Raises ValueError if that would round."""
+    scaled = value.scaleb(places)
+    units = int(scaled)
+    if units != scaled:
+        raise ValueError(f"{value} has more than {places} decimal places.")
+    return units
+
+
+def from_units(units, places=MONEY_PLACES):
+    return Decimal(units).scaleb(-places)
+
+
+def _div_half_even(numerator, denominator):
+    quotient, remainder = divmod(numerator, denominator)
+    twice = remainder * 2
+    if twice > denominator or (twice == denominator and quotient & 1):
+        quotient += 1
+    return quotient
+
+
+def _round_precision(coefficient, exponent):
+    """coefficient * 10**exponent rounded to the Decimal context precision."""
+    if -_PRECISION_LIMIT < coefficient < _PRECISION_LIMIT:
+        return coefficient, exponent
+    excess = len(str(abs(coefficient))) - _PRECISION
+    return _div_half_even(coefficient, 10 ** excess), exponent + excess
+
+
+def _to_cents(coefficient, exponent):
+    """coefficient * 10**exponent quantized to cents (half-even)."""
+    shift = -MONEY_PLACES - exponent
+    if shift <= 0:
+        return coefficient * 10 ** -shift
+    return _div_half_even(coefficient, 10 ** shift)
+
+
+@lru_cache(maxsize=None)
+def _year_fraction(days):
+    """Decimal(days) / Decimal('365.25') as (coefficient, exponent) at context precision."""
+    numerator, denominator = days * 100, 36525
+    # numerator / denominator * 10**scale lands in [10**27, 10**29); step down once if it has 29 digits.
+    scale = _PRECISION + len(str(denominator)) - len(str(numerator))
+    if numerator * 10 ** scale >= denominator * _PRECISION_LIMIT:
+        scale -= 1
+    return _div_half_even(numerator * 10 ** scale, denominator), -scale
+
+
+#MARK: Kernel
+class Position:
+    """
+    Inputs of one position. ``principal`` is the invested amount in cents and
+    ``rate`` the annual rate in ten-thousandths of a percent (6.5% -> 65000).
+    ``end_date`` defaults to start_date + period.
+    """
+    __slots__ = ('principal', 'rate', 'period', 'start_date', 'end_date', 'is_active')
+
+    def __init__(self, principal, rate, period, start_date=None, end_date=None, is_active=True):
+        self.principal = principal
+        self.rate = rate
+        self.period = period
+        self.start_date = start_date
+        self.end_date = end_date if end_date is not None else investment_end_date(start_date, period)
+        self.is_active = is_active
+
+    @classmethod
+    def from_decimals(cls, invested_amount, interest_rate, period, start_date=None, end_date=None, is_active=True):
+        return cls(to_units(invested_amount), to_units(interest_rate, RATE_UNIT_PLACES), period, start_date, end_date, is_active)
+
+    @classmethod
+    def from_row(cls, row):
+        """From a dict of Investor column values (as returned by .values())."""
+        return cls.from_decimals(
+            row['invested_amount'], row['interest_rate_applied'], row['investment_period'],
+            row['investment_start_date'], row['investment_end_date'], row.get('is_investment_active', True),
+        )
+
+
+class Valuation:
+    """Derived values of one position, all in cents."""
+    __slots__ = ('final_return', 'profit', 'accrued', 'portfolio_value')
+
+    def __init__(self, final_return, profit, accrued, portfolio_value):
+        self.final_return = final_return
+        self.profit = profit
+        self.accrued = accrued
+        self.portfolio_value = portfolio_value
+
+
+def value_positions(positions, as_of=None):
+    """
+    [Valuation, ...] for ``positions`` as of one date. Accrual runs from the
+    start date to ``as_of`` capped at the end date; inactive positions, and
+    every position when ``as_of`` is None, accrue nothing.
+    """
+    results = []
+    append = results.append
+    for position in positions:
+        principal, rate = position.principal, position.rate
+        if principal <= 0:
+            append(Valuation(principal, 0, 0, principal))
+            continue
+
+        final_return = _to_cents(*_round_precision(principal * (_RATE_ONE + rate * position.period), _PRODUCT_EXPONENT))
+
+        accrued = 0
+        start, end = position.start_date, position.end_date
+        if position.is_active and start and as_of and rate:
+            days = ((as_of if end is None or as_of < end else end) - start).days
+            if days > 0:
+                coefficient, exponent = _round_precision(principal * rate, _PRODUCT_EXPONENT)
+                fraction, fraction_exponent = _year_fraction(days)
+                accrued = _to_cents(*_round_precision(coefficient * fraction, exponent + fraction_exponent))
+
+        append(Valuation(final_return, final_return - principal, accrued, principal + accrued))
+    return results
+
+
+#MARK: Projection
+def project_investments(inputs, as_of=None):
+    """
+    Derived Investor field values for a batch of purchases. ``inputs`` are
+    (number_of_shares, share_value, interest_percentage, period_in_years,
+    start_date, is_active) tuples; ``interest_percentage`` is None when no
+    active rate applies, and the position is then valued at its principal.
+    Returns one dict per input with invested_amount, interest_rate_applied,
+    final_return_amount, profit, current_accrued_profit, total_portfolio_value
+    and investment_end_date.
+    """
+    invested, positions = [], []
+    for number_of_shares, share_value, interest_percentage, period, start_date, is_active in inputs:
+        invested_amount = (number_of_shares * (share_value or Decimal('0.00'))).quantize(CENT)
+        invested.append((invested_amount, interest_percentage))
+        if invested_amount > 0 and period is not None and interest_percentage is not None:
+            positions.append(Position(
+                to_units(invested_amount), to_units(interest_percentage, RATE_UNIT_PLACES), period,
+                start_date, is_active=is_active,
+            ))
+        else:
+            positions.append(None)
+
+    valuations = iter(value_positions([p for p in positions if p is not None], as_of))
+    results = []
+    for (invested_amount, interest_percentage), position in zip(invested, positions):
+        if position is None:
+            results.append({
+                'invested_amount': invested_amount,
+                'interest_rate_applied': RATE_PLACES,
+                'final_return_amount': invested_amount,
+                'profit': Decimal('0.00'),
+                'current_accrued_profit': Decimal('0.00'),
+                'total_portfolio_value': invested_amount,
+                'investment_end_date': None,
+            })
+            continue
+        valuation = next(valuations)
+        results.append({
+            'invested_amount': invested_amount,
+            'interest_rate_applied': interest_percentage.quantize(RATE_PLACES),
+            'final_return_amount': from_units(valuation.final_return),
+            'profit': from_units(valuation.profit),
+            'current_accrued_profit': from_units(valuation.accrued),
+            'total_portfolio_value': from_units(valuation.portfolio_value),
+            'investment_end_date': position.end_date,
+        })
+    return results
+
+
+def project_investment(number_of_shares, share_value, interest_percentage, period_in_years,
+                       start_date=None, as_of=None, is_active=True):
+    """project_investments for a single purchase."""
+    return project_investments([(number_of_shares, share_value, interest_percentage, period_in_years, start_date, is_active)], as_of)[0]
+
+
+#MARK: Tranches
+def open_tranches(entries):
+    """
+    Open purchase tranches left by share ledger ``entries``: (effective_date,
+    shares, share_value) tuples in the order they apply. Every increase
+    starts a tranche on its date, decreases consume the oldest tranches
+    first. Returns [(effective_date, shares, share_value), ...].
+    """
+    tranches = []
+    for effective_date, shares, share_value in entries:
+        if shares > 0:
+            tranches.append([effective_date, shares, share_value])
+            continue
+        remaining = -shares
+        while remaining and tranches:
+            taken = min(remaining, tranches[0][1])
+            tranches[0][1] -= taken
+            remaining -= taken
+            if not tranches[0][1]:
+                tranches.pop(0)
+    return [tuple(tranche) for tranche in tranches]
+
+
+def project_tranches(tranches, interest_percentage, period_in_years, start_date=None, as_of=None,
+                     is_active=True, end_date=None):
+    """
+    project_investment for an investment held as ``tranches`` (see
+    open_tranches). Each tranche is priced at its own share value and accrues
+    from its own date to the investment's end date; its final return is the
+    term's return less the interest of the days before it was bought. An
+    investment with a single tranche on its start date values exactly as
+    project_investment does.
+    """
+    end_date = end_date if end_date is not None else investment_end_date(start_date, period_in_years)
+    principals = [to_units((shares * (share_value or Decimal('0.00'))).quantize(CENT)) for _, shares, share_value in tranches]
+    invested_amount = from_units(sum(principals))
+    if invested_amount <= 0 or period_in_years is None or interest_percentage is None:
+        return {
+            'invested_amount': invested_amount,
+            'interest_rate_applied': RATE_PLACES,
+            'final_return_amount': invested_amount,
+            'profit': Decimal('0.00'),
+            'current_accrued_profit': Decimal('0.00'),
+            'total_portfolio_value': invested_amount,
+            'investment_end_date': None,
+        }
+
+    rate = to_units(interest_percentage, RATE_UNIT_PLACES)
+    held = [
+        Position(principal, rate, period_in_years, tranche_start, end_date, is_active)
+        for (tranche_start, _, _), principal in zip(tranches, principals)
+    ]
+    late = [
+        (index, Position(principal, rate, period_in_years, start_date, tranche_start))
+        for index, ((tranche_start, _, _), principal) in enumerate(zip(tranches, principals))
+        if start_date and tranche_start and tranche_start > start_date
+    ]
+    missed = [0] * len(held)
+    if late:
+        # Each of these positions ends on its tranche's date, so accrual stops there.
+        last_start = max(position.end_date for _, position in late)
+        for (index, _), valuation in zip(late, value_positions([position for _, position in late], last_start)):
+            missed[index] = valuation.accrued
+
+    final_return = accrued = 0
+    for valuation, skipped in zip(value_positions(held, as_of), missed):
+        final_return += valuation.final_return - skipped
+        accrued += valuation.accrued
+    principal = sum(principals)
+    return {
+        'invested_amount': invested_amount,
+        'interest_rate_applied': interest_percentage.quantize(RATE_PLACES),
+        'final_return_amount': from_units(final_return),
+        'profit': from_units(final_return - principal),
+        'current_accrued_profit': from_units(accrued),
+        'total_portfolio_value': from_units(principal + accrued),
+        'investment_end_date': end_date,
+    }
@@ -5,18 +5,41 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
 from django.shortcuts import get_object_or_404
-from .models import Investor, InvestmentServiceGroup, InterestRateSetting
+from .models import Investor, InvestmentServiceGroup, InterestRateSetting, UserPortfolioSnapshot, GroupPortfolioSnapshot
+from .portfolio import RESOLUTIONS, SNAPSHOT_VALUE_FIELDS, downsample
+from .quotes import quote as quote_investment
+from .scenarios import get_book, parse_shocks
+from django.core.exceptions import ImproperlyConfigured
+from decimal import InvalidOperation
+from django.utils.dateparse import parse_date
+from datetime import timedelta
+import time
 from .serializers import (
     InvestorSerializer, InvestmentServiceGroupSerializer,
-    InterestRateSettingSerializer, UserSerializerForInvestor
+    InterestRateSettingSerializer, UserSerializerForInvestor,
+    ShareLedgerEntrySerializer, ShareTransactionSerializer,
 )
+from .ledger import InsufficientShares, InvestmentClosed, record_entry, shares_as_of, tranches
+from .inventory import SoldOut, allocate, release
 from sha.permissions import IsAdminUser
-from sha.utils import api_response 
+from sha.idempotency import idempotent
+from sha.utils import CSVContentNegotiation, api_response, iter_values_list, streaming_csv_response
 from rest_framework.exceptions import ValidationError as DRFValidationError 
 from .permissions import IsAdminUser, IsOwnerOrAdmin
+from .filters import InvestorFilterBackend, OptionalPageNumberPagination
+from .jobs import INVESTOR_EXPORT_COLUMNS
+from django.utils import timezone
 from django.db.models import Sum, Count
 from decimal import Decimal
 
+
+def _parse_query_date(value):
+    """YYYY-MM-DD query parameter as a date, or None when malformed or not a real day (e.g. 2025-02-30)."""
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
 # MARK: servicegroup
 class InvestmentServiceGroupViewSet(viewsets.ModelViewSet):
     queryset = InvestmentServiceGroup.objects.all().order_by('name')
@@ -188,14 +211,18 @@ class InvestorViewSet(viewsets.ModelViewSet):
     queryset = Investor.objects.all().select_related('user', 'selected_service_group')
     serializer_class = InvestorSerializer
     permission_classes = [permissions.IsAuthenticated] 
+    filter_backends = [InvestorFilterBackend]
+    pagination_class = OptionalPageNumberPagination
 
     def get_permissions(self):
        
-        if self.action in ['retrieve', 'list', 'full_profile', 'my_profile', 'create', 'dashboard_summary']:
+        if self.action in ['retrieve', 'list', 'full_profile', 'my_profile', 'create', 'dashboard_summary', 'portfolio_history', 'quote']:
             return [permissions.IsAuthenticated()]
         elif self.action in ['update', 'partial_update', 'destroy']:
            
             return [IsOwnerOrAdmin()]
+        elif self.action in ['shares', 'ledger']:
+            return [permissions.IsAuthenticated(), IsOwnerOrAdmin()]
        
         return [IsAdminUser()] 
 
@@ -209,6 +236,7 @@ class InvestorViewSet(viewsets.ModelViewSet):
             
             return queryset.filter(user=self.request.user) 
 
+    @idempotent('investors.create')
     def create(self, request, *args, **kwargs):
         with transaction.atomic():
             mutable_data = request.data.copy()
@@ -255,6 +283,12 @@ class InvestorViewSet(viewsets.ModelViewSet):
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
                 )
 
+            try:
+                # Conditional decrement of one inventory stripe; rolls back with this transaction.
+                allocate(serializer.validated_data['selected_service_group'], serializer.validated_data['number_of_shares'])
+            except SoldOut as e:
+                return api_response(False, str(e), status_code=status.HTTP_400_BAD_REQUEST)
+
             self.perform_create(serializer)
             headers = self.get_success_headers(serializer.data)
 
@@ -307,7 +341,10 @@ class InvestorViewSet(viewsets.ModelViewSet):
     def update(self, request, *args, **kwargs):
         with transaction.atomic():
             partial = kwargs.pop('partial', False)
-            instance = self.get_object()
+            # Lock the row: save() writes number_of_shares back, which must not undo
+            # a concurrent /shares/ movement, and the inventory delta below needs
+            # the balance it replaces.
+            instance = Investor.objects.select_for_update().get(pk=self.get_object().pk)
 
             
             mutable_data = request.data.copy()
@@ -326,11 +363,36 @@ class InvestorViewSet(viewsets.ModelViewSet):
                     error_message = f"{first_error_key}: {e.detail[first_error_key][0]}"
                 return api_response(False, error_message, data=e.detail, status_code=status.HTTP_400_BAD_REQUEST)
 
+            shares = serializer.validated_data.get('number_of_shares', instance.number_of_shares)
+            group = serializer.validated_data.get('selected_service_group', instance.selected_service_group)
+            if shares != instance.number_of_shares or group != instance.selected_service_group:
+                if not request.user.is_staff:
+                    return api_response(
+                        False,
+                        "The shares and service group of an investment can't be edited; redeem shares through its /shares/ endpoint.",
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                    )
+                if instance.is_investment_active and not instance.matured_at:
+                    try:
+                        self.move_inventory(instance, group, shares)
+                    except SoldOut as e:
+                        return api_response(False, str(e), status_code=status.HTTP_400_BAD_REQUEST)
 
             self.perform_update(serializer)
 
             return api_response(True, "Investor profile updated successfully.", data=serializer.data)
 
+    def move_inventory(self, instance, group, shares):
+        """Staff edit of shares or group: takes the difference from (or returns it to) the capped inventories."""
+        if group == instance.selected_service_group:
+            if shares > instance.number_of_shares:
+                allocate(group, shares - instance.number_of_shares)
+            else:
+                release(group, instance.number_of_shares - shares)
+            return
+        allocate(group, shares)
+        release(instance.selected_service_group, instance.number_of_shares)
+
     def destroy(self, request, *args, **kwargs):
         with transaction.atomic():
             instance = self.get_object()
@@ -357,6 +419,107 @@ class InvestorViewSet(viewsets.ModelViewSet):
         }
         return api_response(True, "Full investor profile retrieved.", data=response_data)
 
+#MARK: share ledger
+    @action(detail=True, methods=['post'])
+    @idempotent('investors.shares')
+    def shares(self, request, pk=None):
+        """
+        Buys or redeems shares of an existing investment: {"kind": "purchase",
+        "number_of_shares": "2.50"} (or "redemption"). The balance changes with
+        one atomic increment/decrement and the movement is appended to the share
+        ledger; purchased shares accrue from the day they are bought.
+        """
+        investor = self.get_object()
+        serializer = ShareTransactionSerializer(data=request.data)
+        if not serializer.is_valid():
+            first_error_key = next(iter(serializer.errors))
+            return api_response(False, f"{first_error_key}: {serializer.errors[first_error_key][0]}",
+                                data=serializer.errors, status_code=status.HTTP_400_BAD_REQUEST)
+
+        shares = serializer.validated_data['number_of_shares']
+        kind = serializer.validated_data['kind']
+        try:
+            entry = record_entry(investor, shares if kind == 'purchase' else -shares, kind, user=request.user)
+        except (InsufficientShares, InvestmentClosed, SoldOut) as e:
+            return api_response(False, str(e), status_code=status.HTTP_400_BAD_REQUEST)
+
+        data = {
+            'entry': ShareLedgerEntrySerializer(entry).data,
+            'investment': self.get_serializer(investor).data,
+        }
+        return api_response(True, "Share balance updated successfully.", data=data, status_code=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'])
+    def ledger(self, request, pk=None):
+        """
+        Share ledger of an investment, newest first (?page=/?page_size= to
+        paginate), with the open purchase tranches and their accrued profit.
+        ?as_of=YYYY-MM-DD also returns the share balance at the end of that day.
+        """
+        investor = self.get_object()
+        today = timezone.localdate()
+        data = {
+            'number_of_shares': investor.number_of_shares,
+            'tranches': tranches(investor, today),
+        }
+        if request.query_params.get('as_of'):
+            as_of = _parse_query_date(request.query_params['as_of'])
+            if as_of is None:
+                return api_response(False, "as_of must be YYYY-MM-DD.", status_code=status.HTTP_400_BAD_REQUEST)
+            data['shares_as_of'] = {'date': as_of, 'number_of_shares': shares_as_of(investor, as_of)}
+
+        entries = investor.ledger_entries.order_by('-id')
+        page = self.paginate_queryset(entries)
+        if page is not None:
+            data['entries'] = self.get_paginated_response(ShareLedgerEntrySerializer(page, many=True).data).data
+        else:
+            data['entries'] = ShareLedgerEntrySerializer(entries, many=True).data
+        return api_response(True, "Share ledger retrieved successfully.", data=data, status_code=status.HTTP_200_OK)
+
+#MARK: export
+    @action(detail=False, methods=['get'], content_negotiation_class=CSVContentNegotiation)
+    def export(self, request):
+        """
+        Streams the investment book as CSV (staff only). Accepts the same
+        filters as the list; rows are read in primary key batches, so memory
+        use doesn't grow with the size of the book.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        header = [column for column, lookup in INVESTOR_EXPORT_COLUMNS]
+        lookups = [lookup for column, lookup in INVESTOR_EXPORT_COLUMNS]
+        return streaming_csv_response(
+            f"investments-{timezone.localdate():%Y%m%d}.csv", header, iter_values_list(queryset, lookups),
+        )
+
+#MARK: scenario
+    @action(detail=False, methods=['post'])
+    def scenario(self, request):
+        """
+        Staff what-if over the open book: POST {"shocks": [{"group": 3,
+        "period": 10, "rate_bp": -50, "share_value_pct": 0}, ...]} returns
+        projected payouts per group and period before and after the shocks.
+        Nothing is written. The book is loaded once and reused for
+        SCENARIO_BOOK_TTL seconds; send "refresh": true to reload it.
+        """
+        try:
+            shocks = parse_shocks(request.data.get('shocks'))
+        except ValueError as e:
+            return api_response(False, str(e), status_code=status.HTTP_400_BAD_REQUEST)
+        try:
+            book = get_book(refresh=bool(request.data.get('refresh')))
+        except ImproperlyConfigured as e:
+            return api_response(False, str(e), status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        started = time.monotonic()
+        groups = book.run(shocks)
+        data = {
+            'book_loaded_at': book.loaded_at,
+            'positions': len(book),
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1),
+            'groups': groups,
+        }
+        return api_response(True, "Scenario simulated successfully.", data=data, status_code=status.HTTP_200_OK)
+
 #MARK: my profile
     @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
     def my_profile(self, request):
@@ -445,4 +608,78 @@ class InvestorViewSet(viewsets.ModelViewSet):
             "Dashboard summary retrieved successfully.",
             data=response_data,
             status_code=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+# MARK: portfolio history
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def portfolio_history(self, request):
+        """
+        Portfolio value over time from the daily snapshots, downsampled to
+        ?resolution=day|week|month (default day) between ?start and ?end
+        (default: the last 365 days). Staff may pass ?user_id= for another
+        user or ?group= for a service group's totals.
+        """
+        params = request.query_params
+        resolution = params.get('resolution', 'day')
+        if resolution not in RESOLUTIONS:
+            return api_response(False, f"resolution must be one of: {', '.join(RESOLUTIONS)}.", status_code=status.HTTP_400_BAD_REQUEST)
+
+        end = _parse_query_date(params['end']) if params.get('end') else timezone.localdate()
+        start = _parse_query_date(params['start']) if params.get('start') else (end and end - timedelta(days=365))
+        if start is None or end is None or start > end:
+            return api_response(False, "start and end must be dates (YYYY-MM-DD) with start before end.", status_code=status.HTTP_400_BAD_REQUEST)
+        max_days = {'day': 2 * 366, 'week': 10 * 366, 'month': 50 * 366}[resolution]
+        if (end - start).days > max_days:
+            return api_response(False, f"A {resolution} series can span at most {max_days} days.", status_code=status.HTTP_400_BAD_REQUEST)
+
+        if params.get('group') or params.get('user_id'):
+            if not request.user.is_staff:
+                return api_response(False, "You do not have permission to view other portfolios.", status_code=status.HTTP_403_FORBIDDEN)
+        try:
+            if params.get('group'):
+                snapshots = GroupPortfolioSnapshot.objects.filter(service_group_id=int(params['group']))
+            else:
+                snapshots = UserPortfolioSnapshot.objects.filter(user_id=int(params.get('user_id') or request.user.pk))
+        except ValueError:
+            return api_response(False, "user_id and group must be numeric IDs.", status_code=status.HTTP_400_BAD_REQUEST)
+
+        # One range scan on the (owner, date) unique index.
+        rows = snapshots.filter(date__range=(start, end)).order_by('date').values('date', *SNAPSHOT_VALUE_FIELDS)
+        return api_response(
+            True,
+            "Portfolio history retrieved successfully.",
+            data={
+                "resolution": resolution,
+                "start": start,
+                "end": end,
+                "points": downsample(rows, resolution),
+            },
+            status_code=status.HTTP_200_OK
+        )
+
+# MARK: quote
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def quote(self, request):
+        """
+        Read-only preview of buying ?number_of_shares= in every active service
+        group and period (narrow with ?group=1,2 and ?period=5). Computed from
+        the cached rate matrix; nothing is written and no query runs while the
+        cache is warm.
+        """
+        params = request.query_params
+        try:
+            number_of_shares = Decimal(params.get('number_of_shares', ''))
+        except InvalidOperation:
+            number_of_shares = None
+        if number_of_shares is None or not number_of_shares.is_finite() or number_of_shares <= 0 \
+                or number_of_shares != number_of_shares.quantize(Decimal('0.01')) or number_of_shares >= Decimal('1e13'):
+            return api_response(False, "number_of_shares must be a positive number with at most 2 decimal places.", status_code=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            group_ids = {int(pk) for pk in params['group'].split(',') if pk.strip()} if params.get('group') else None
+            periods = {int(p) for p in params['period'].split(',') if p.strip()} if params.get('period') else None
+        except ValueError:
+            return api_response(False, "group and period must be comma separated numbers.", status_code=status.HTTP_400_BAD_REQUEST)
+
+        quotes = quote_investment(number_of_shares.quantize(Decimal('0.01')), group_ids, periods)
+        return api_response(True, "Investment quotes calculated successfully.", data=quotes, status_code=status.HTTP_200_OK)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MediaManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'media_management'
+
+    def ready(self):
+        from .signals import connect_file_cleanup
+        connect_file_cleanup()
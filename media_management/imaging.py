@@ -0,0 +1,205 @@
+"""
+Pure Pillow helpers used by the media pipeline.
+
+Nothing in here touches the ORM or settings, so these functions can run in a
+worker process (see media_management.tasks) without setting Django up.
+"""
+import io
+import os
+from collections import namedtuple
+
+from PIL import Image, ImageOps
+
+FORMAT_EXTENSIONS = {
+    'WEBP': '.webp',
+    'JPEG': '.jpg',
+    'PNG': '.png',
+}
+
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# Orientations 5-8 are rotated by 90 degrees, i.e. width and height are swapped on display.
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+#MARK: Probe
+class ImageProbe(namedtuple('ImageProbe', 'format width height orientation size')):
+    """Header facts about an image. ``width``/``height`` are as stored, before EXIF orientation."""
+    __slots__ = ()
+
+    @property
+    def display_size(self):
+        if self.orientation in _TRANSPOSED_ORIENTATIONS:
+            return self.height, self.width
+        return self.width, self.height
+
+
+def _byte_size(fileobj):
+    size = getattr(fileobj, 'size', None)
+    if size is not None:
+        return size
+    position = fileobj.tell()
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(position)
+    return size
+
+
+def _probe_webp(fileobj):
+    """
+    Reads (width, height, orientation) straight from the RIFF chunks of a WebP
+    file, or returns None if it isn't one. Pillow's WebP plugin reads the whole
+    file on open, this only touches chunk headers (and the EXIF chunk, if any).
+    """
+    header = fileobj.read(30)
+    if len(header) < 30 or header[:4] != b'RIFF' or header[8:12] != b'WEBP':
+        return None
+
+    chunk = header[12:16]
+    if chunk == b'VP8 ':
+        width = int.from_bytes(header[26:28], 'little') & 0x3FFF
+        height = int.from_bytes(header[28:30], 'little') & 0x3FFF
+        return width, height, 1
+    if chunk == b'VP8L':
+        b0, b1, b2, b3 = header[21:25]
+        width = 1 + (((b1 & 0x3F) << 8) | b0)
+        height = 1 + (((b3 & 0x0F) << 10) | (b2 << 2) | ((b1 & 0xC0) >> 6))
+        return width, height, 1
+    if chunk != b'VP8X':
+        return None
+
+    width = 1 + int.from_bytes(header[24:27], 'little')
+    height = 1 + int.from_bytes(header[27:30], 'little')
+    orientation = 1
+    if header[20] & 0x08:  # EXIF flag: skip chunk bodies until we find it
+        offset = 12
+        while True:
+            fileobj.seek(offset)
+            chunk_header = fileobj.read(8)
+            if len(chunk_header) < 8:
+                break
+            chunk_size = int.from_bytes(chunk_header[4:], 'little')
+            if chunk_header[:4] == b'EXIF':
+                exif = Image.Exif()
+                exif.load(fileobj.read(chunk_size))
+                orientation = exif.get(EXIF_ORIENTATION_TAG, 1)
+                break
+            offset += 8 + chunk_size + (chunk_size & 1)
+    return width, height, orientation
+
+
+def probe_image(fileobj):
+    """
+    Reads format, dimensions, EXIF orientation and byte size from the image
+    header without decoding pixel data.
+
+    The result is cached on ``fileobj`` (as ``_image_probe``), so validators,
+    serializers and ``ImageUpload.save`` can all ask for it and the upload is
+    only parsed once. Raises ``UnidentifiedImageError`` for non-images.
+    """
+    cached = getattr(fileobj, '_image_probe', None)
+    if cached is not None:
+        return cached
+
+    if hasattr(fileobj, 'seek'):
+        fileobj.seek(0)
+    webp = _probe_webp(fileobj)
+    if webp is not None:
+        probe = ImageProbe('WEBP', *webp, _byte_size(fileobj))
+    else:
+        fileobj.seek(0)
+        with Image.open(fileobj) as img:
+            orientation = 1
+            # PNG keeps eXIf wherever it likes; asking Pillow for it may decode the
+            # whole image, so only trust what the header parse already found.
+            if img.format != 'PNG' or 'exif' in img.info:
+                orientation = img.getexif().get(EXIF_ORIENTATION_TAG, 1)
+            probe = ImageProbe(img.format, img.width, img.height, orientation, _byte_size(fileobj))
+    if hasattr(fileobj, 'seek'):
+        fileobj.seek(0)
+
+    try:
+        fileobj._image_probe = probe
+    except AttributeError:
+        pass  # objects without __dict__ just don't get the cache
+    return probe
+
+
+def _encode(img, fmt, quality):
+    if fmt == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    buffer = io.BytesIO()
+    options = {'quality': quality}
+    if fmt == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    elif fmt == 'WEBP':
+        options.update(method=4)
+    img.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def _prepare(img, max_size):
+    """Decodes ``img`` upright, in a saveable mode, no larger than max_size x max_size."""
+    # Let the JPEG decoder skip DCT scales we are going to throw away anyway.
+    img.draft('RGB', (max_size, max_size))
+    prepared = ImageOps.exif_transpose(img)
+    if prepared.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+        prepared = prepared.convert('RGBA' if 'transparency' in img.info else 'RGB')
+    if prepared.width > max_size or prepared.height > max_size:
+        prepared.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    return prepared
+
+
+#MARK: Normalize
+def normalize_image(source, max_size, format='WEBP', quality=80):
+    """
+    Re-encodes ``source`` upright (EXIF orientation applied), capped to
+    ``max_size`` on its longest side, with no metadata carried over
+    (EXIF, GPS, XMP, comments and ICC data are dropped by re-encoding).
+    Returns a dict with format, width, height and data (bytes).
+    """
+    with Image.open(source) as img:
+        normalized = _prepare(img, max_size)
+        fmt = format.upper()
+        return {
+            'format': fmt,
+            'width': normalized.width,
+            'height': normalized.height,
+            'data': _encode(normalized, fmt, quality),
+        }
+
+
+#MARK: Variants
+def render_variants(source, specs):
+    """
+    Renders every variant in ``specs`` from one decode of ``source``.
+
+    ``source`` is a path or a file-like object, ``specs`` maps a label to
+    ``{'max_size': int, 'format': 'WEBP'|'JPEG', 'quality': int}``.
+    Variants are produced largest first and each one is downscaled from the
+    previous, so the full-size image is only resampled once.
+    Returns a list of dicts with label, format, width, height and data (bytes).
+    """
+    ordered = sorted(specs.items(), key=lambda item: item[1]['max_size'], reverse=True)
+    if not ordered:
+        return []
+
+    with Image.open(source) as img:
+        current = _prepare(img, ordered[0][1]['max_size'])
+
+        results = []
+        for label, spec in ordered:
+            max_size = spec['max_size']
+            if current.width > max_size or current.height > max_size:
+                current = current.copy()
+                current.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+            fmt = spec.get('format', 'WEBP').upper()
+            results.append({
+                'label': label,
+                'format': fmt,
+                'width': current.width,
+                'height': current.height,
+                'data': _encode(current, fmt, spec.get('quality', 80)),
+            })
+        return results
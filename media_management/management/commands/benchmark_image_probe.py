@@ -0,0 +1,79 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from media_management.imaging import probe_image
+
+
+class CountingBytesIO(io.BytesIO):
+    """BytesIO that records how many bytes were read from it."""
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+        self.size = len(data)
+
+    def read(self, *args):
+        chunk = super().read(*args)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def legacy_inspection(fileobj):
+    """What an upload used to cost: ImageField verify(), the dimension validator and ImageUpload.save each open the file."""
+    fileobj.seek(0)
+    with Image.open(fileobj) as img:
+        img.verify()
+    fileobj.seek(0)
+    with Image.open(fileobj) as img:
+        img.size
+    fileobj.seek(0)
+    with Image.open(fileobj) as img:
+        img.size
+    return fileobj.size
+
+
+def probed_inspection(fileobj):
+    """Serializer field, validators and ImageUpload.save all share one cached probe."""
+    for _ in range(3):
+        probe = probe_image(fileobj)
+    return probe.size
+
+
+class Command(BaseCommand):
+    help = "Compares the old multi-open image inspection with the cached header probe on large PNG/WebP inputs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--width', type=int, default=6000)
+        parser.add_argument('--height', type=int, default=4000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--formats', nargs='+', default=['PNG', 'WEBP'])
+
+    def handle(self, *args, **options):
+        size = (options['width'], options['height'])
+        self.stdout.write(f"Generating {size[0]}x{size[1]} test images...")
+        # Noise keeps PNG from compressing to nothing, which is the realistic worst case.
+        source = Image.merge('RGB', [Image.effect_noise(size, 64) for _ in range(3)])
+
+        for fmt in options['formats']:
+            fmt = fmt.upper()
+            buffer = io.BytesIO()
+            source.save(buffer, fmt)
+            data = buffer.getvalue()
+            self.stdout.write(f"\n{fmt}: {len(data) / (1024 * 1024):.1f} MB")
+
+            for label, inspect in (('legacy', legacy_inspection), ('probe', probed_inspection)):
+                elapsed = 0.0
+                bytes_read = 0
+                for _ in range(options['repeat']):
+                    fileobj = CountingBytesIO(data)
+                    started = time.perf_counter()
+                    inspect(fileobj)
+                    elapsed += time.perf_counter() - started
+                    bytes_read += fileobj.bytes_read
+                repeat = options['repeat']
+                self.stdout.write(
+                    f"  {label:<7} {elapsed / repeat * 1000:9.3f} ms/upload "
+                    f"{bytes_read / repeat / 1024:12.1f} KiB read/upload"
+                )
@@ -0,0 +1,126 @@
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from media_management.models import StoredBlob
+from media_management.signals import get_file_fields
+
+
+def iter_media_files(root):
+    """Yields (relative name, mtime) for every file under ``root`` without building the full listing."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    name = os.path.relpath(entry.path, root).replace(os.sep, '/')
+                    yield name, entry.stat(follow_symlinks=False).st_mtime
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes files under MEDIA_ROOT that no file column references any more. "
+        "The tree is scanned and diffed against the database in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Files looked up per database round (default: 1000).")
+        parser.add_argument('--min-age-hours', type=float, default=24,
+                            help="Ignore files modified more recently than this, e.g. uploads still in flight (default: 24).")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="List orphaned files without deleting them.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        cutoff = time.time() - options['min_age_hours'] * 3600
+
+        columns = [
+            (model, field.attname)
+            for model in apps.get_models()
+            for field in get_file_fields(model)
+        ]
+
+        scanned = orphaned = freed = 0
+        batch = []
+        for name, mtime in iter_media_files(settings.MEDIA_ROOT):
+            scanned += 1
+            if mtime > cutoff:
+                continue
+            batch.append(name)
+            if len(batch) >= batch_size:
+                count, size = self.collect_batch(batch, columns, options['dry_run'])
+                orphaned += count
+                freed += size
+                batch = []
+        if batch:
+            count, size = self.collect_batch(batch, columns, options['dry_run'])
+            orphaned += count
+            freed += size
+
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} file(s). {verb} {orphaned} orphaned file(s), {freed / (1024 * 1024):.1f} MB."
+        ))
+
+    def collect_batch(self, names, columns, dry_run):
+        # Counts are read before the references: a reference added after this
+        # point raises the count, which the conditional delete below notices.
+        ref_counts = dict(StoredBlob.objects.filter(name__in=names).values_list('name', 'ref_count'))
+        referenced = set()
+        for model, attname in columns:
+            referenced.update(
+                model._default_manager.filter(**{f'{attname}__in': names}).values_list(attname, flat=True)
+            )
+
+        orphans = [name for name in names if name not in referenced]
+        size = 0
+        deleted = []
+        for name in orphans:
+            path = os.path.join(settings.MEDIA_ROOT, name)
+            try:
+                file_size = os.path.getsize(path)
+            except FileNotFoundError:
+                continue
+            if dry_run:
+                self.stdout.write(name)
+            elif not self.remove_file(name, path, ref_counts.get(name)):
+                continue
+            size += file_size
+            deleted.append(name)
+        return len(deleted), size
+
+    def remove_file(self, name, path, ref_count):
+        """
+        Deletes an orphaned file and its refcount row. A blob is only removed
+        when its row still holds the count seen when the batch was looked up:
+        if the storage added a reference in between, the conditional DELETE
+        matches nothing and the file stays. A file that had no row is left
+        alone if the storage has registered it since. The unlink happens before the
+        DELETE commits, so a concurrent save of the same bytes waits on the
+        row and then stores a fresh copy.
+        """
+        with transaction.atomic():
+            if ref_count is None:
+                if StoredBlob.objects.select_for_update().filter(name=name).exists():
+                    return False
+            elif not StoredBlob.objects.filter(name=name, ref_count=ref_count).delete()[0]:
+                return False
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                return False
+        return True
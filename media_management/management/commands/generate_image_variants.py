@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from media_management.models import ImageUpload
+from media_management.tasks import get_image_source, get_executor, get_variant_specs, store_variants
+from media_management.imaging import render_variants
+
+
+class Command(BaseCommand):
+    help = "Renders missing IMAGE_VARIANTS for existing ImageUpload rows using the media process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Images submitted to the pool at a time (default: 100).")
+        parser.add_argument('--all', action='store_true',
+                            help="Re-render variants even for images that already have them.")
+
+    def handle(self, *args, **options):
+        specs = get_variant_specs()
+        if not specs:
+            raise CommandError("settings.IMAGE_VARIANTS is empty; nothing to render.")
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        queryset = ImageUpload.objects.order_by('pk').only('pk', 'image')
+        if not options['all']:
+            queryset = queryset.filter(variants__isnull=True)
+
+        executor = get_executor()
+        done = failed = 0
+        last_pk = None
+        while True:
+            batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch_qs[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            futures = [
+                (upload.pk, executor.submit(render_variants, get_image_source(upload.image), specs))
+                for upload in batch
+            ]
+            for image_id, future in futures:
+                try:
+                    store_variants(image_id, future.result())
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Image {image_id}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(f"Rendered variants for {done} image(s), {failed} failed."))
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from media_management.imaging import normalize_image, probe_image
+from media_management.tasks import get_executor, get_image_source, get_profile_picture_spec, store_normalized_profile_picture
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Re-encodes existing profile pictures per settings.PROFILE_PICTURE_NORMALIZATION using the media process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help="Users submitted to the pool at a time (default: 100).")
+
+    def handle(self, *args, **options):
+        spec = get_profile_picture_spec()
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        queryset = (
+            User.objects.exclude(profile_picture__isnull=True).exclude(profile_picture='')
+            .order_by('pk').only('pk', 'profile_picture')
+        )
+        executor = get_executor()
+        done = skipped = failed = 0
+        last_pk = None
+        while True:
+            batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch_qs[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            futures = []
+            for user in batch:
+                try:
+                    with user.profile_picture.open('rb') as f:
+                        probe = probe_image(f)
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"User {user.pk}: {e}")
+                    continue
+                if probe.format == spec['format'].upper() and max(probe.width, probe.height) <= spec['max_size'] \
+                        and probe.orientation == 1:
+                    skipped += 1
+                    continue
+                source = get_image_source(user.profile_picture)
+                futures.append((user, executor.submit(normalize_image, source, **spec)))
+
+            for user, future in futures:
+                try:
+                    if store_normalized_profile_picture(user.pk, user.profile_picture.name, future.result()):
+                        done += 1
+                    else:
+                        skipped += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"User {user.pk}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Normalized {done} profile picture(s), {skipped} already normalized or changed, {failed} failed."
+        ))
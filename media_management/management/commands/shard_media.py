@@ -0,0 +1,110 @@
+import os
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import FileField
+
+from media_management.utils import is_sharded_name
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves files stored in flat upload directories into the sharded "
+        "<prefix>/<ab>/<cd>/ layout and rewrites the file columns in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help="Rows moved and updated per transaction (default: 500).")
+        parser.add_argument('--model', action='append', dest='models', default=[],
+                            help="Limit to app_label.ModelName (repeatable). Defaults to every model with file fields.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what would be moved without touching files or rows.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+        else:
+            models = apps.get_models()
+
+        total = 0
+        for model in models:
+            for field in model._meta.concrete_fields:
+                if isinstance(field, FileField):
+                    total += self.shard_field(model, field, batch_size, options['dry_run'])
+
+        verb = "Would move" if options['dry_run'] else "Moved"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {total} file(s) into the sharded layout."))
+
+    def shard_field(self, model, field, batch_size, dry_run):
+        label = f"{model._meta.label}.{field.name}"
+        queryset = (
+            model._default_manager
+            .exclude(**{f'{field.attname}__isnull': True})
+            .exclude(**{field.attname: ''})
+            .only('pk', field.attname)
+            .order_by('pk')
+        )
+
+        moved = 0
+        last_pk = None
+        while True:
+            batch_qs = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            batch = list(batch_qs[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            pending = [obj for obj in batch if not is_sharded_name(getattr(obj, field.attname).name)]
+            if not pending:
+                continue
+            if dry_run:
+                moved += len(pending)
+                continue
+            moved += self.move_batch(field, pending, label)
+
+        if moved:
+            self.stdout.write(f"{label}: {moved} file(s)")
+        return moved
+
+    def move_batch(self, field, objs, label):
+        storage = field.storage
+        updated, old_names, new_names = [], [], []
+
+        for obj in objs:
+            old_name = getattr(obj, field.attname).name
+            if not storage.exists(old_name):
+                self.stderr.write(f"{label}: {old_name} is missing on disk (pk={obj.pk}), skipped.")
+                continue
+            new_name = field.generate_filename(obj, os.path.basename(old_name))
+            with storage.open(old_name, 'rb') as source:
+                new_name = storage.save(new_name, source, max_length=field.max_length)
+            setattr(obj, field.attname, new_name)
+            updated.append(obj)
+            old_names.append(old_name)
+            new_names.append(new_name)
+
+        if not updated:
+            return 0
+
+        try:
+            with transaction.atomic():
+                type(updated[0])._default_manager.bulk_update(updated, [field.attname])
+        except Exception:
+            # Rows still point at the old files; drop the copies we just made.
+            for name in new_names:
+                storage.delete(name)
+            raise
+
+        # Only remove the originals once the new paths are committed.
+        for name in old_names:
+            storage.delete(name)
+        return len(updated)
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:50
+
+import django.db.models.deletion
+import media_management.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_management', '0002_storedblob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=50)),
+                ('format', models.CharField(max_length=10)),
+                ('file', models.ImageField(upload_to=media_management.utils.ShardedUploadPath('image_variants'))),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('file_size', models.PositiveIntegerField(help_text='File size in bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='variants', to='media_management.imageupload')),
+            ],
+            options={
+                'verbose_name': 'Image Variant',
+                'verbose_name_plural': 'Image Variants',
+                'ordering': ['width'],
+                'unique_together': {('image', 'label')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_management', '0003_imagevariant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='imageupload',
+            index=models.Index(fields=['user', 'image'], name='imageupload_user_image_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='imagevariant',
+            index=models.Index(fields=['file'], name='imagevariant_file_idx'),
+        ),
+    ]
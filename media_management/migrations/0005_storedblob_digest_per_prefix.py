@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-19 10:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media_management', '0004_media_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='storedblob',
+            name='digest',
+            field=models.CharField(db_index=True, help_text='SHA-256 of the file contents', max_length=64),
+        ),
+    ]
@@ -2,15 +2,15 @@ from django.db import models
 from django.contrib.auth import get_user_model
 import uuid
 import os
-from PIL import Image
+from .utils import sharded_path, ShardedUploadPath
+from .imaging import probe_image
 
 User = get_user_model()
 
 def get_image_upload_path(instance, filename):
-    """Generate dynamic upload path for images"""
+    """Generate dynamic upload path for images: images/<ab>/<cd>/<uuid>.<ext>"""
     ext = filename.split('.')[-1].lower()
-    filename = f"{uuid.uuid4().hex}.{ext}"
-    return f'images/{filename}'
+    return sharded_path('images', uuid.uuid4().hex, f'.{ext}')
 
 class ImageUpload(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -31,6 +31,9 @@ class ImageUpload(models.Model):
     
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['user', 'image'], name='imageupload_user_image_idx'),
+        ]
         verbose_name = 'Image Upload'
         verbose_name_plural = 'Image Uploads'
     
@@ -38,16 +41,17 @@ class ImageUpload(models.Model):
         return f"{self.original_filename} - {self.user.name or self.user.mobile_number}"
     
     def save(self, *args, **kwargs):
-        if self.image:
-            self.file_size = self.image.size
+        # Only a freshly assigned file needs inspecting; re-saves keep the stored metadata.
+        if self.image and (not self.image._committed or self.width is None):
             self.original_filename = os.path.basename(self.image.name)
             
-            # Get image dimensions
+            # Reuse the header probe the upload validators already cached
             try:
-                with Image.open(self.image) as img:
-                    self.width, self.height = img.size
+                probe = probe_image(self.image.file)
+                self.file_size = probe.size
+                self.width, self.height = probe.display_size
             except Exception:
-                pass
+                self.file_size = self.image.size
         
         super().save(*args, **kwargs)
     
@@ -55,4 +59,47 @@ class ImageUpload(models.Model):
         """Get the image URL"""
         if self.image:
             return self.image.url
-        return None
\ No newline at end of file
+        return None
+
+
+class ImageVariant(models.Model):
+    """A resized/re-encoded rendition of an ImageUpload (see settings.IMAGE_VARIANTS)."""
+    image = models.ForeignKey(ImageUpload, on_delete=models.CASCADE, related_name='variants')
+    label = models.CharField(max_length=50)
+    format = models.CharField(max_length=10)
+    file = models.ImageField(upload_to=ShardedUploadPath('image_variants'))
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file_size = models.PositiveIntegerField(help_text="File size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['width']
+        unique_together = ('image', 'label')
+        indexes = [
+            models.Index(fields=['file'], name='imagevariant_file_idx'),
+        ]
+        verbose_name = 'Image Variant'
+        verbose_name_plural = 'Image Variants'
+
+    def __str__(self):
+        return f"{self.image_id} - {self.label} ({self.width}x{self.height})"
+
+class StoredBlob(models.Model):
+    """
+    One row per distinct file kept by ContentAddressedStorage, per upload
+    prefix: the same bytes saved by two fields are two blobs.
+    ``ref_count`` is the number of saves currently pointing at the blob.
+    """
+    digest = models.CharField(max_length=64, db_index=True, help_text="SHA-256 of the file contents")
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name of the blob")
+    size = models.PositiveBigIntegerField(help_text="File size in bytes")
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Stored Blob'
+        verbose_name_plural = 'Stored Blobs'
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
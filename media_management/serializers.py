@@ -1,16 +1,70 @@
 from rest_framework import serializers
-from .models import ImageUpload
-from .validators import ImageSizeValidator, ImageDimensionValidator, image_extension_validator
+from .models import ImageUpload, ImageVariant
+from .validations import ImageSizeValidator, ImageDimensionValidator, image_extension_validator
+from .imaging import probe_image
+from .signing import signed_media_url
 
 
+class SignedFileField(serializers.FileField):
+    """FileField that represents the file as an expiring signed URL (see signing.py)."""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return signed_media_url(value.name)
+
+
+class SignedImageField(serializers.ImageField):
+    """ImageField that represents the file as an expiring signed URL (see signing.py)."""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return signed_media_url(value.name)
+
+
+class ProbedImageField(serializers.FileField):
+    """
+    Image upload field that checks the file with the cached header probe
+    (imaging.probe_image) instead of DRF's ImageField, which opens and
+    verify()s the whole file with Pillow on top of our own validators.
+    """
+    default_error_messages = {
+        'invalid_image': 'Upload a valid image. The file you uploaded was either not an image or a corrupted image.',
+    }
+
+    def to_internal_value(self, data):
+        file_object = super().to_internal_value(data)
+        try:
+            probe_image(file_object)
+        except Exception:
+            self.fail('invalid_image')
+        return file_object
+
+class ImageVariantSerializer(serializers.ModelSerializer):
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImageVariant
+        fields = ['label', 'format', 'width', 'height', 'url']
+
+    def get_url(self, obj):
+        return signed_media_url(obj.file.name) if obj.file else None
+
 
 class ImageUploadSerializer(serializers.ModelSerializer):
+    image = ProbedImageField(
+        write_only=True,
+        validators=[image_extension_validator, ImageSizeValidator(), ImageDimensionValidator()]
+    )
     image_url = serializers.SerializerMethodField()
+    variants = ImageVariantSerializer(many=True, read_only=True)
 
     class Meta:
         model = ImageUpload
-        fields = ['id', 'image_url']
+        fields = ['id', 'image', 'image_url', 'width', 'height', 'variants']
+        read_only_fields = ['id', 'width', 'height']
 
     def get_image_url(self, obj):
-        return obj.get_image_url()
+        return signed_media_url(obj.image.name) if obj.image else None
 
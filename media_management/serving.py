@@ -0,0 +1,117 @@
+"""
+Helpers for handing media files to the client.
+
+With settings.MEDIA_ACCEL_REDIRECT set, Python only decides *whether* a file
+may be served and the web server streams it (nginx ``X-Accel-Redirect`` or
+Apache/lighttpd ``X-Sendfile``). Without it, files are streamed by Django with
+single-range ``Range`` support so large downloads can resume.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _content_type(name):
+    content_type, encoding = mimetypes.guess_type(name)
+    return content_type or 'application/octet-stream'
+
+
+def _parse_range(header, size):
+    """
+    Returns (start, end) inclusive for a single ``bytes=`` range, None when
+    the header should be ignored (absent, multi-range, malformed) and
+    'unsatisfiable' when it can't be served.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, min(end, size - 1)
+
+
+def _iter_range(fileobj, start, length):
+    try:
+        fileobj.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fileobj.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+#MARK: serve
+def serve_media_file(request, name, storage=None, cache_control='private, max-age=3600'):
+    """
+    Builds the response for media file ``name``: an accelerated redirect when
+    MEDIA_ACCEL_REDIRECT is configured, otherwise a streamed FileResponse that
+    honours ``Range``. Raises Http404 for missing or unsafe names.
+    """
+    storage = storage or default_storage
+    try:
+        if not name or not storage.exists(name):
+            raise Http404("Media file not found.")
+    except SuspiciousFileOperation:
+        raise Http404("Media file not found.")
+
+    content_type = _content_type(name)
+    accel = getattr(settings, 'MEDIA_ACCEL_REDIRECT', None)
+
+    if accel == 'nginx':
+        response = HttpResponse(content_type=content_type)
+        prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name)
+    elif accel == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = storage.path(name)
+    else:
+        response = _file_response(request, storage, name, content_type)
+
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _file_response(request, storage, name, content_type):
+    size = storage.size(name)
+    byte_range = _parse_range(request.META.get('HTTP_RANGE'), size)
+
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    fileobj = storage.open(name, 'rb')
+    if byte_range is None:
+        # Whole file: FileResponse lets the WSGI server use sendfile() when it can.
+        return FileResponse(fileobj, content_type=content_type, filename=os.path.basename(name))
+
+    start, end = byte_range
+    length = end - start + 1
+    response = StreamingHttpResponse(_iter_range(fileobj, start, length), status=206, content_type=content_type)
+    response['Content-Length'] = str(length)
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
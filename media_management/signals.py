@@ -0,0 +1,111 @@
+"""
+Removes files from storage when the row pointing at them stops doing so.
+
+Every model with a FileField/ImageField gets four receivers (connected in
+MediaManagementConfig.ready): post_init remembers the stored file names,
+pre_save notes which fields are about to store a new upload, post_save
+schedules the previous file for deletion when a field changed, and
+post_delete schedules every file of a deleted row. Deletion happens in
+transaction.on_commit, so a rolled back save or delete never loses a file.
+Bulk operations (QuerySet.update, bulk_update) don't send these signals;
+code using them releases the old files itself.
+"""
+import logging
+from functools import lru_cache, partial
+
+from django.apps import apps
+from django.core.files import File
+from django.db import transaction
+from django.db.models import FileField
+from django.db.models.fields.files import FieldFile
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+
+logger = logging.getLogger(__name__)
+
+ORIGINALS_ATTR = '_media_original_names'
+PENDING_ATTR = '_media_pending_uploads'
+
+
+@lru_cache(maxsize=None)
+def get_file_fields(model):
+    return tuple(f for f in model._meta.concrete_fields if isinstance(f, FileField))
+
+
+def _stored_name(value):
+    """Name of the file ``value`` refers to in storage, or None while it is an upload that hasn't been saved yet."""
+    if isinstance(value, FieldFile):
+        return (value.name or None) if value._committed else None
+    if isinstance(value, str):
+        return value or None
+    return None
+
+
+def _is_upload(value):
+    # The descriptor keeps an assigned File as-is until it is read, so check for both.
+    if isinstance(value, FieldFile):
+        return not value._committed
+    return isinstance(value, File)
+
+
+def _delete_file(storage, name):
+    try:
+        storage.delete(name)
+    except Exception:
+        logger.exception("Could not delete media file %s", name)
+
+
+def _delete_on_commit(field, name, using):
+    transaction.on_commit(partial(_delete_file, field.storage, name), using=using, robust=True)
+
+
+def remember_file_names(sender, instance, **kwargs):
+    # Read __dict__ directly: going through the descriptor would load deferred fields.
+    instance.__dict__[ORIGINALS_ATTR] = {
+        field.attname: _stored_name(instance.__dict__.get(field.attname))
+        for field in get_file_fields(sender)
+        if field.attname in instance.__dict__
+    }
+
+
+def remember_pending_uploads(sender, instance, raw=False, **kwargs):
+    # Fields holding an upload that this save will write to storage (in FileField.pre_save).
+    instance.__dict__[PENDING_ATTR] = set() if raw else {
+        field.attname for field in get_file_fields(sender)
+        if _is_upload(instance.__dict__.get(field.attname))
+    }
+
+
+def release_replaced_files(sender, instance, created, using, **kwargs):
+    originals = instance.__dict__.get(ORIGINALS_ATTR, {})
+    pending = instance.__dict__.pop(PENDING_ATTR, set())
+    for field in get_file_fields(sender):
+        if field.attname not in instance.__dict__:
+            continue
+        current = _stored_name(instance.__dict__[field.attname])
+        previous = originals.get(field.attname)
+        if previous and previous != current:
+            _delete_on_commit(field, previous, using)
+        elif previous and field.attname in pending:
+            # The upload had the same content as the file it replaced, so the
+            # content-addressed storage handed back the same name with one more
+            # reference; drop the reference the replaced file held.
+            _delete_on_commit(field, previous, using)
+        originals[field.attname] = current
+    instance.__dict__[ORIGINALS_ATTR] = originals
+
+
+def release_deleted_files(sender, instance, using, **kwargs):
+    for field in get_file_fields(sender):
+        name = _stored_name(instance.__dict__.get(field.attname))
+        if name:
+            _delete_on_commit(field, name, using)
+
+
+def connect_file_cleanup():
+    for model in apps.get_models():
+        if model._meta.abstract or model._meta.proxy or not get_file_fields(model):
+            continue
+        post_init.connect(remember_file_names, sender=model, dispatch_uid=f'media_init_{model._meta.label}')
+        pre_save.connect(remember_pending_uploads, sender=model, dispatch_uid=f'media_pre_save_{model._meta.label}')
+        post_save.connect(release_replaced_files, sender=model, dispatch_uid=f'media_save_{model._meta.label}')
+        post_delete.connect(release_deleted_files, sender=model, dispatch_uid=f'media_delete_{model._meta.label}')
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.apps import apps
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# <dir>/<ab>/<cd>/<sha256 digest><ext>
+BLOB_NAME_RE = re.compile(r'^(?:.+/)?[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}(?:\.[^/]*)?$')
+# <prefix>/<ab>/<cd>/<file>, the layout of media_management.utils.ShardedUploadPath
+SHARD_SUFFIX_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{2}/[^/]+$')
+
+
+#MARK: Content Addressed Storage
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that keeps every distinct file exactly once.
+
+    Uploads are hashed (SHA-256) while they are streamed to disk and stored as
+    ``<prefix>/<ab>/<cd>/<digest>.<ext>``, where ``<prefix>`` is the upload
+    directory the field's ``upload_to`` asked for (``blobs`` when it gave
+    none). A ``StoredBlob`` row keeps a reference count per blob name, i.e.
+    per prefix and digest, so saving bytes that already exist under the same
+    prefix only bumps the count and returns the existing name, and
+    ``delete()`` only removes the file once the last reference is gone. Files
+    of different fields never share a blob.
+    """
+    blob_dir = 'blobs'
+    temp_dir = 'tmp'
+    hash_chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save(), so there is
+        # nothing to make unique here (and no exists() round trips to pay for).
+        return name
+
+    def blob_name(self, digest, ext='', prefix=None):
+        return f'{prefix or self.blob_dir}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+    def upload_prefix(self, name):
+        """Upload directory of a generated ``name``, without the shard directories of a sharded upload_to."""
+        name = name.replace('\\', '/')
+        if SHARD_SUFFIX_RE.search(name):
+            return SHARD_SUFFIX_RE.sub('', name)
+        return os.path.dirname(name)
+
+    def _save(self, name, content):
+        ext = os.path.splitext(name)[1].lower()
+
+        if hasattr(content, 'temporary_file_path'):
+            # Large uploads are already spooled to disk by Django: hash them in
+            # place and move the file instead of copying it.
+            source_path = content.temporary_file_path()
+            digest, size = self._hash_file(source_path)
+            is_temp = False
+        else:
+            source_path, digest, size = self._spool(content)
+            is_temp = True
+
+        StoredBlob = apps.get_model('media_management', 'StoredBlob')
+        blob_name = self.blob_name(digest, ext, self.upload_prefix(name))
+
+        if self._add_reference(StoredBlob, blob_name):
+            if self.exists(blob_name):
+                if is_temp:
+                    os.remove(source_path)
+                return blob_name
+            # The row outlived its file (e.g. a manual clean-up); restore it.
+            self._move_into_place(source_path, blob_name)
+            return blob_name
+
+        self._move_into_place(source_path, blob_name)
+        try:
+            with transaction.atomic():
+                StoredBlob.objects.create(digest=digest, name=blob_name, size=size, ref_count=1)
+        except IntegrityError:
+            # Someone stored the same bytes under the same name concurrently;
+            # the file we moved over theirs is identical.
+            if self._add_reference(StoredBlob, blob_name):
+                return blob_name
+            raise
+        return blob_name
+
+    def delete(self, name):
+        if not name:
+            raise ValueError('The name must be given to delete().')
+
+        StoredBlob = apps.get_model('media_management', 'StoredBlob')
+        with transaction.atomic():
+            # The row stays locked until the file is gone: a concurrent save of
+            # the same bytes waits in _add_reference, finds no row and then
+            # writes a fresh copy instead of having it unlinked under it.
+            blob = StoredBlob.objects.select_for_update().filter(name=name).values('pk', 'ref_count').first()
+            if blob is None:
+                if not BLOB_NAME_RE.match(name):
+                    # A legacy file saved before this storage was enabled.
+                    super().delete(name)
+                return
+            if blob['ref_count'] > 1:
+                StoredBlob.objects.filter(pk=blob['pk']).update(ref_count=F('ref_count') - 1)
+                return
+            StoredBlob.objects.filter(pk=blob['pk']).delete()
+            super().delete(name)
+
+    #MARK: helpers
+    def _add_reference(self, StoredBlob, name):
+        """Increments the reference count of blob ``name``. Returns False if there is no such blob."""
+        return bool(StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1))
+
+    def _hash_file(self, path):
+        hasher = hashlib.sha256()
+        size = 0
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.hash_chunk_size), b''):
+                hasher.update(chunk)
+                size += len(chunk)
+        return hasher.hexdigest(), size
+
+    def _spool(self, content):
+        """Streams ``content`` into a temporary file under MEDIA_ROOT, hashing it on the way."""
+        temp_dir = self.path(self.temp_dir)
+        os.makedirs(temp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir)
+
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            os.remove(temp_path)
+            raise
+        return temp_path, hasher.hexdigest(), size
+
+    def _move_into_place(self, source_path, name):
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        file_move_safe(source_path, full_path, allow_overwrite=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
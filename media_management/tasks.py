@@ -0,0 +1,177 @@
+"""
+Off-request media jobs.
+
+CPU-heavy Pillow work runs in a small process pool (media_management.imaging
+only depends on Pillow, so the workers never import the ORM). The parent
+process stores the results once a worker is done, from the pool's callback
+thread, so an upload response never waits for image processing.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+
+from .imaging import FORMAT_EXTENSIONS, normalize_image, render_variants
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Returns the shared media process pool, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None or getattr(_executor, '_broken', False):
+            # A worker that died (OOM, decompression bomb...) breaks the whole pool.
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'MEDIA_PROCESS_POOL_SIZE', 2),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def get_variant_specs():
+    return getattr(settings, 'IMAGE_VARIANTS', {})
+
+
+def get_image_source(field_file):
+    """Local path when the storage has one, otherwise the raw bytes."""
+    try:
+        return field_file.path
+    except NotImplementedError:
+        with field_file.open('rb') as f:
+            return f.read()
+
+
+#MARK: Image variants
+def schedule_image_variants(image_uploads):
+    """
+    Queues variant generation for one or more ImageUpload rows once the
+    current transaction commits.
+    """
+    if not isinstance(image_uploads, (list, tuple)):
+        image_uploads = [image_uploads]
+    specs = get_variant_specs()
+    if not specs:
+        return
+    jobs = [(upload.pk, get_image_source(upload.image)) for upload in image_uploads if upload.image]
+    # robust: a pool problem must never fail the request that uploaded the image.
+    transaction.on_commit(partial(_submit_variant_jobs, jobs, specs), robust=True)
+
+
+def _submit_variant_jobs(jobs, specs):
+    executor = get_executor()
+    for image_id, source in jobs:
+        future = executor.submit(render_variants, source, specs)
+        future.add_done_callback(partial(_store_variants_callback, image_id))
+
+
+def _store_variants_callback(image_id, future):
+    close_old_connections()
+    try:
+        store_variants(image_id, future.result())
+    except BrokenProcessPool:
+        logger.error("Media process pool broke while rendering image %s; it will be recreated.", image_id)
+    except Exception:
+        logger.exception("Generating variants for image %s failed", image_id)
+    finally:
+        close_old_connections()
+
+
+def store_variants(image_id, rendered):
+    """Saves rendered variant bytes and records them with a single bulk_create."""
+    from .models import ImageUpload, ImageVariant
+
+    if not ImageUpload.objects.filter(pk=image_id).exists():
+        return []  # deleted while we were rendering
+
+    variants = []
+    for item in rendered:
+        variant = ImageVariant(
+            image_id=image_id,
+            label=item['label'],
+            format=item['format'],
+            width=item['width'],
+            height=item['height'],
+            file_size=len(item['data']),
+        )
+        filename = f"{item['label']}{FORMAT_EXTENSIONS.get(item['format'], '')}"
+        variant.file.save(filename, ContentFile(item['data']), save=False)
+        variants.append(variant)
+
+    with transaction.atomic():
+        ImageVariant.objects.filter(image_id=image_id, label__in=[v.label for v in variants]).delete()
+        ImageVariant.objects.bulk_create(variants)
+    return variants
+
+
+#MARK: Profile pictures
+def get_profile_picture_spec():
+    return getattr(settings, 'PROFILE_PICTURE_NORMALIZATION', {'max_size': 512, 'format': 'WEBP', 'quality': 80})
+
+
+def schedule_profile_picture_normalization(user):
+    """
+    Re-encodes ``user.profile_picture`` (orientation applied, metadata
+    stripped, size capped) once the current transaction commits. Runs in the
+    media process pool; if the pool can't take it, it runs inline instead.
+    """
+    if not user.profile_picture:
+        return
+    job = (user.pk, user.profile_picture.name, get_image_source(user.profile_picture))
+    transaction.on_commit(partial(_submit_profile_picture_job, *job), robust=True)
+
+
+def _submit_profile_picture_job(user_id, original_name, source):
+    spec = get_profile_picture_spec()
+    try:
+        future = get_executor().submit(normalize_image, source, **spec)
+    except Exception:
+        logger.warning("Media process pool unavailable, normalizing profile picture of user %s inline", user_id)
+        store_normalized_profile_picture(user_id, original_name, normalize_image(source, **spec))
+        return
+    future.add_done_callback(partial(_store_profile_picture_callback, user_id, original_name))
+
+
+def _store_profile_picture_callback(user_id, original_name, future):
+    close_old_connections()
+    try:
+        store_normalized_profile_picture(user_id, original_name, future.result())
+    except Exception:
+        logger.exception("Normalizing the profile picture of user %s failed", user_id)
+    finally:
+        close_old_connections()
+
+
+def store_normalized_profile_picture(user_id, original_name, normalized):
+    """
+    Swaps the user's profile picture for the normalized file, unless it was
+    changed again in the meantime. Returns the new name, or None if skipped.
+    """
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    field = User._meta.get_field('profile_picture')
+    storage = field.storage
+
+    filename = f"avatar{FORMAT_EXTENSIONS.get(normalized['format'], '')}"
+    new_name = storage.save(field.generate_filename(None, filename), ContentFile(normalized['data']),
+                            max_length=field.max_length)
+    if new_name == original_name:
+        storage.delete(new_name)  # already normalized: drop the extra reference
+        return None
+
+    updated = User.objects.filter(pk=user_id, profile_picture=original_name).update(profile_picture=new_name)
+    if updated:
+        transaction.on_commit(partial(storage.delete, original_name))
+        return new_name
+    storage.delete(new_name)
+    return None
@@ -1,10 +1,11 @@
 from django.urls import path
-from .views import ImageUploadView, ImageDetailView
+from .views import ImageUploadView, ImageBatchUploadView, ImageDetailView
 
 app_name = 'media_management'
 
 urlpatterns = [
     path('upload/', ImageUploadView.as_view(), name='image-upload'),
+    path('upload/batch/', ImageBatchUploadView.as_view(), name='image-batch-upload'),
     path('images/', ImageUploadView.as_view(), name='image-list'),
     path('images/<uuid:image_id>/', ImageDetailView.as_view(), name='image-detail'),
 ]
\ No newline at end of file
@@ -0,0 +1,35 @@
+import os
+import re
+import uuid
+
+from django.utils.deconstruct import deconstructible
+
+# <prefix>/<ab>/<cd>/<file> where ab/cd are the first hex characters of the file key
+SHARDED_NAME_RE = re.compile(r'^(?:.+/)?[0-9a-f]{2}/[0-9a-f]{2}/[^/]+$')
+
+
+def sharded_path(prefix, key, ext=''):
+    """Builds ``<prefix>/<key[:2]>/<key[2:4]>/<key><ext>``."""
+    return f'{prefix}/{key[:2]}/{key[2:4]}/{key}{ext}'
+
+
+def is_sharded_name(name):
+    return bool(name) and bool(SHARDED_NAME_RE.match(name))
+
+
+#MARK: Sharded upload path
+@deconstructible
+class ShardedUploadPath:
+    """
+    ``upload_to`` callable that spreads files over two levels of hex
+    sub-directories so no single directory grows to millions of entries.
+    """
+    def __init__(self, prefix):
+        self.prefix = prefix.strip('/')
+
+    def __call__(self, instance, filename):
+        ext = os.path.splitext(filename)[1].lower()
+        return sharded_path(self.prefix, uuid.uuid4().hex, ext)
+
+    def __eq__(self, other):
+        return isinstance(other, ShardedUploadPath) and self.prefix == other.prefix
@@ -1,7 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
 from django.utils.deconstruct import deconstructible
-from PIL import Image
+from .imaging import probe_image
 
 @deconstructible
 class ImageSizeValidator:
@@ -10,7 +10,7 @@ class ImageSizeValidator:
         self.max_size = max_size_mb * 1024 * 1024  # Convert to bytes
     
     def __call__(self, image):
-        if image.size > self.max_size:
+        if get_probe(image).size > self.max_size:
             raise ValidationError(f'Image size cannot exceed {self.max_size // (1024*1024)}MB')
 
 @deconstructible
@@ -21,17 +21,20 @@ class ImageDimensionValidator:
         self.max_height = max_height
     
     def __call__(self, image):
-        try:
-            with Image.open(image) as img:
-                width, height = img.size
-                if width > self.max_width or height > self.max_height:
-                    raise ValidationError(
-                        f'Image dimensions cannot exceed {self.max_width}x{self.max_height} pixels'
-                    )
-        except Exception as e:
-            raise ValidationError('Invalid image file')
+        width, height = get_probe(image).display_size
+        if width > self.max_width or height > self.max_height:
+            raise ValidationError(
+                f'Image dimensions cannot exceed {self.max_width}x{self.max_height} pixels'
+            )
+
+def get_probe(image):
+    """Cached header probe of ``image`` (see imaging.probe_image), as a ValidationError for non-images."""
+    try:
+        return probe_image(image)
+    except Exception:
+        raise ValidationError('Invalid image file')
 
 # Common validators
 image_extension_validator = FileExtensionValidator(
     allowed_extensions=['jpg', 'jpeg', 'png', 'gif', 'webp']
-)
\ No newline at end of file
+)
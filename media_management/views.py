@@ -1,11 +1,27 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.authentication import SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Exists, OuterRef, Q
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from django.http import Http404, HttpResponseForbidden
 from django.shortcuts import get_object_or_404
-from .models import ImageUpload
+from .models import ImageUpload, ImageVariant
 from .serializers import ImageUploadSerializer
+from .validations import get_probe
+from .serving import serve_media_file
+from .signing import verify_media_signature
+from .tasks import schedule_image_variants
+
+User = get_user_model()
 
 def api_response(success, message, data=None, status_code=status.HTTP_200_OK):
     return Response({
@@ -23,6 +39,8 @@ class ImageUploadView(APIView):
         serializer = ImageUploadSerializer(data=request.data)
         if serializer.is_valid():
             image_upload = serializer.save(user=request.user)
+            # Thumbnails etc. are rendered off-request; variants is empty until they land.
+            schedule_image_variants(image_upload)
             return api_response(
                 True,
                 "Image uploaded successfully",
@@ -39,7 +57,7 @@ class ImageUploadView(APIView):
     
     def get(self, request):
         """Get user's uploaded images"""
-        images = ImageUpload.objects.filter(user=request.user)
+        images = ImageUpload.objects.filter(user=request.user).prefetch_related('variants')
         serializer = ImageUploadSerializer(images, many=True)
         return api_response(
             True,
@@ -47,12 +65,100 @@ class ImageUploadView(APIView):
             data=serializer.data
         )
 
+#MARK: Batch upload
+def _store_upload(storage, name, uploaded_file, max_length):
+    """Writes one file from a worker thread; the thread's DB connection (blob refcounts) is closed after."""
+    try:
+        return storage.save(name, uploaded_file, max_length=max_length)
+    finally:
+        close_old_connections()
+
+
+class ImageBatchUploadView(APIView):
+    """
+    Uploads several images (multipart field ``images``, repeated) in one request.
+    Every file is validated up front, valid files are written to storage in
+    parallel and all rows are inserted with a single bulk_create. The response
+    reports success or errors per file, in request order.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        files = request.FILES.getlist('images')
+        max_files = getattr(settings, 'IMAGE_BATCH_MAX_FILES', 20)
+        if not files:
+            return api_response(False, "No images provided. Send one or more files as 'images'.",
+                                status_code=status.HTTP_400_BAD_REQUEST)
+        if len(files) > max_files:
+            return api_response(False, f"You can upload at most {max_files} images per request.",
+                                status_code=status.HTTP_400_BAD_REQUEST)
+
+        # 1. Validate everything first (the header probe is cached on each file for step 3).
+        image_field = ImageUploadSerializer().fields['image']
+        results = [None] * len(files)
+        valid = []
+        for index, uploaded_file in enumerate(files):
+            try:
+                valid.append((index, image_field.run_validation(uploaded_file)))
+            except DRFValidationError as e:
+                results[index] = {"index": index, "filename": uploaded_file.name, "success": False, "errors": e.detail}
+
+        # 2. Write the valid files concurrently.
+        model_field = ImageUpload._meta.get_field('image')
+        stored = []
+        if valid:
+            with ThreadPoolExecutor(max_workers=min(len(valid), getattr(settings, 'IMAGE_BATCH_WRITE_WORKERS', 4))) as pool:
+                futures = [
+                    pool.submit(_store_upload, model_field.storage, model_field.generate_filename(None, f.name), f,
+                                model_field.max_length)
+                    for _, f in valid
+                ]
+                for (index, uploaded_file), future in zip(valid, futures):
+                    try:
+                        stored.append((index, uploaded_file, future.result()))
+                    except Exception:
+                        results[index] = {"index": index, "filename": uploaded_file.name, "success": False,
+                                          "errors": ["The file could not be stored."]}
+
+        # 3. One INSERT for all rows; metadata comes from the cached probes (bulk_create skips save()).
+        uploads = []
+        for index, uploaded_file, name in stored:
+            probe = get_probe(uploaded_file)
+            width, height = probe.display_size
+            uploads.append(ImageUpload(
+                user=request.user, image=name, original_filename=uploaded_file.name,
+                width=width, height=height, file_size=probe.size,
+            ))
+        if uploads:
+            try:
+                with transaction.atomic():
+                    ImageUpload.objects.bulk_create(uploads)
+                    schedule_image_variants(uploads)
+            except Exception:
+                for upload in uploads:
+                    model_field.storage.delete(upload.image.name)
+                raise
+
+        for (index, uploaded_file, _), upload in zip(stored, uploads):
+            results[index] = {"index": index, "filename": uploaded_file.name, "success": True,
+                              "data": ImageUploadSerializer(upload).data}
+
+        created = len(uploads)
+        failed = len(files) - created
+        return api_response(
+            created > 0,
+            f"{created} image(s) uploaded, {failed} failed.",
+            data={"created": created, "failed": failed, "results": results},
+            status_code=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+
 class ImageDetailView(APIView):
     permission_classes = [IsAuthenticated]
     
     def get(self, request, image_id):
         """Get image details"""
-        image = get_object_or_404(ImageUpload, id=image_id, user=request.user)
+        image = get_object_or_404(ImageUpload.objects.prefetch_related('variants'), id=image_id, user=request.user)
         serializer = ImageUploadSerializer(image)
         return api_response(
             True,
@@ -88,4 +194,47 @@ class ImageDetailView(APIView):
             True,
             "Image deleted successfully",
             status_code=status.HTTP_204_NO_CONTENT
-        )
\ No newline at end of file
+        )
+
+#MARK: Protected media
+def user_can_access_media(user, name):
+    """
+    True if ``name`` is one of ``user``'s files. One query: a primary key
+    lookup on the user plus indexed EXISTS probes for the other tables.
+    """
+    if user.is_staff:
+        return True
+    return User.objects.filter(pk=user.pk).filter(
+        Q(profile_picture=name)
+        | Q(proof_of_identity_document=name)
+        | Q(proof_of_address_document=name)
+        | Exists(ImageUpload.objects.filter(user=OuterRef('pk'), image=name))
+        | Exists(ImageVariant.objects.filter(file=name, image__user=OuterRef('pk')))
+    ).exists()
+
+
+class ProtectedMediaView(APIView):
+    """
+    Serves MEDIA_ROOT to the owner of a file (or staff) only. Accepts JWT and,
+    for admin pages, session authentication; the bytes themselves are sent by
+    the web server when MEDIA_ACCEL_REDIRECT is configured.
+    """
+    authentication_classes = [JWTAuthentication, SessionAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, path):
+        if not user_can_access_media(request.user, path):
+            # Same answer as a missing file, so file names can't be probed.
+            raise Http404("Media file not found.")
+        return serve_media_file(request, path)
+
+
+def signed_media_view(request, expires, signature, path):
+    """
+    Serves a file for a URL made by signing.signed_media_url. Plain Django view
+    on purpose: no authentication classes and no queries, only the HMAC check.
+    """
+    if not verify_media_signature(path, expires, signature):
+        return HttpResponseForbidden("Invalid or expired media link.")
+    max_age = max(0, int(expires - time.time()))
+    return serve_media_file(request, path, cache_control=f'private, max-age={max_age}, immutable')
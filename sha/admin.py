@@ -3,7 +3,15 @@
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import UserProfileSettings
+from .models import UserProfileSettings, BackgroundJob
+from .paginators import EstimatedCountPaginator
+from .utils import iter_values_list, streaming_csv_response
+from .serializers import USER_EXPORT_FIELDS
+from django.utils import timezone
+from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
+from media_management.tasks import schedule_profile_picture_normalization
+from media_management.signing import signed_media_url
 
 User = get_user_model()
 
@@ -40,7 +48,7 @@ class UserAdmin(BaseUserAdmin):
         }),
         ('Bank Details', {
             'fields': (
-                'bank_name', 'account_number', 'ifsc', 'branch',
+                'bank_name', 'account_number', 'bank_details',
             ),
         }),
         ('Nominee Details', {
@@ -71,6 +79,62 @@ class UserAdmin(BaseUserAdmin):
     )
     # list_filter and search_fields updated
     list_filter = ('occupation', 'is_active', 'is_staff', 'is_superuser')
-    search_fields = ('mobile_number', 'name', 'email', 'account_number', 'nominee_name', 'nominee_mobile_number')
+    # Prefix matches on indexed columns only ('^' = istartswith, i.e. LIKE 'x%'); a
+    # contains-search over six columns scanned the whole table on every lookup.
+    search_fields = ('^mobile_number', '^name', '^email')
     readonly_fields = ('last_login', 'date_joined', 'otp_created_at')
     ordering = ('-date_joined',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'profile_picture' in form.changed_data and obj.profile_picture:
+            schedule_profile_picture_normalization(obj)
+
+    actions = ['download_csv']
+
+    @admin.action(description=_("Download selected users as CSV"))
+    def download_csv(self, request, queryset):
+        return streaming_csv_response(
+            f"users-{timezone.localdate():%Y%m%d}.csv", USER_EXPORT_FIELDS, iter_values_list(queryset, USER_EXPORT_FIELDS),
+        )
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'progress_display', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'kind')
+    list_select_related = ('created_by',)
+    fields = (
+        'kind', 'status', 'progress_display', 'output_link', 'result', 'error',
+        'created_by', 'created_at', 'started_at', 'finished_at', 'updated_at', 'payload',
+    )
+    readonly_fields = fields
+    ordering = ('-created_at',)
+
+    def change_view(self, request, object_id, form_url='', extra_context=None):
+        # Jobs started from admin actions land here; keep the page current while they run.
+        response = super().change_view(request, object_id, form_url, extra_context)
+        job = BackgroundJob.objects.filter(pk=object_id).only('status').first()
+        if job and job.status in (BackgroundJob.STATUS_PENDING, BackgroundJob.STATUS_RUNNING):
+            response['Refresh'] = '3'
+        return response
+
+    @admin.display(description='Output')
+    def output_link(self, obj):
+        if not obj.output:
+            return '-'
+        return format_html('<a href="{}">{}</a>', signed_media_url(obj.output.name), _('Download'))
+
+    @admin.display(description='Progress')
+    def progress_display(self, obj):
+        if obj.progress is None:
+            return f"{obj.processed_items}"
+        return f"{obj.processed_items}/{obj.total_items} ({obj.progress}%)"
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
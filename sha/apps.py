@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ShaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'sha'
+
+    def ready(self):
+        from django.core import checks
+        from . import jobs  # registers the job handlers
+        from .idempotency import check_idempotency_cache
+        checks.register(check_idempotency_cache, checks.Tags.caches)
@@ -0,0 +1,75 @@
+# SHA_GROUP/sha/filters.py
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.pagination import PageNumberPagination
+
+from .models import User
+
+
+#MARK: User Directory Filter
+class UserDirectoryFilterBackend(BaseFilterBackend):
+    """
+    Query parameters for the staff user directory.
+
+        search=+9715      prefix of mobile number, name or email
+        mobile=, name=, email=    prefix of that column only
+        occupation=service        one of User.OCCUPATION_CHOICES
+        is_active=true
+        fields=id,name,mobile_number    (projection, applied by the view)
+
+    Matching is prefix-only on indexed columns (mobile_number and email are
+    unique, name has user_name_idx), so a search is an index range scan
+    rather than LIKE '%...%' over every row.
+    """
+    MIN_PREFIX_LENGTH = 3
+    # istartswith compiles to LIKE 'x%' on MySQL (case-insensitive collation), which can use the index.
+    PREFIX_COLUMNS = {
+        'mobile': 'mobile_number__istartswith',
+        'name': 'name__istartswith',
+        'email': 'email__istartswith',
+    }
+    OCCUPATIONS = {value for value, label in User.OCCUPATION_CHOICES}
+
+    def _prefix(self, params, name):
+        value = params.get(name, '').strip()
+        if value and len(value) < self.MIN_PREFIX_LENGTH:
+            raise ValidationError({name: [f"Enter at least {self.MIN_PREFIX_LENGTH} characters."]})
+        return value
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        search = self._prefix(params, 'search')
+        if search:
+            condition = Q()
+            for lookup in self.PREFIX_COLUMNS.values():
+                condition |= Q(**{lookup: search})
+            queryset = queryset.filter(condition)
+
+        for param, lookup in self.PREFIX_COLUMNS.items():
+            value = self._prefix(params, param)
+            if value:
+                queryset = queryset.filter(**{lookup: value})
+
+        occupation = params.get('occupation')
+        if occupation:
+            if occupation not in self.OCCUPATIONS:
+                raise ValidationError({'occupation': [f"Must be one of: {', '.join(sorted(self.OCCUPATIONS))}."]})
+            queryset = queryset.filter(occupation=occupation)
+
+        is_active = params.get('is_active')
+        if is_active:
+            lowered = is_active.strip().lower()
+            if lowered not in ('true', 'false', '1', '0'):
+                raise ValidationError({'is_active': ["Must be true or false."]})
+            queryset = queryset.filter(is_active=lowered in ('true', '1'))
+
+        return queryset
+
+
+#MARK: Pagination
+class UserDirectoryPagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -0,0 +1,109 @@
+# SHA_GROUP/sha/idempotency.py
+"""
+Idempotency-Key support for write endpoints.
+
+A client that may retry a POST sends a unique ``Idempotency-Key`` header.
+The first response for that key is cached for IDEMPOTENCY_KEY_TTL seconds;
+a retry with the same key and body gets that response back without
+the view running again (no validation, transaction or OTP). Reusing a key
+with a different body is rejected with 422. A retry that arrives while the
+first request is still running gets 409. Server errors (5xx) are not
+stored, so they can be retried.
+
+The store is the IDEMPOTENCY_CACHE cache alias. It must be shared between
+worker processes (the database cache, Redis or Memcached) for replays to
+work across them; check_idempotency_cache warns at startup when it isn't.
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .utils import api_response
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+
+
+def _cache():
+    return caches[getattr(settings, 'IDEMPOTENCY_CACHE', 'default')]
+
+
+def check_idempotency_cache(app_configs=None, **kwargs):
+    """System check: a per-process cache would let a retry that reaches another worker run again."""
+    alias = getattr(settings, 'IDEMPOTENCY_CACHE', 'default')
+    backend = caches[alias]
+    if isinstance(backend, (LocMemCache, DummyCache)):
+        return [checks.Warning(
+            f"IDEMPOTENCY_CACHE points at the {type(backend).__name__} cache '{alias}', which is not shared "
+            "between worker processes, so Idempotency-Key retries can run twice.",
+            hint="Use a database, Redis or Memcached cache for IDEMPOTENCY_CACHE.",
+            id='sha.W001',
+        )]
+    return []
+
+
+def _fingerprint(request):
+    return hashlib.sha256(request.method.encode() + b'\0' + request.get_full_path().encode() + b'\0' + request.body).hexdigest()
+
+
+def idempotent(scope):
+    """
+    Decorates an APIView handler (``def post(self, request, ...)``) so an
+    ``Idempotency-Key`` header makes retries replay the first response.
+    ``scope`` namespaces the keys of one endpoint; keys are also scoped to
+    the authenticated user, if any.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        def wrapper(view, request, *args, **kwargs):
+            key = request.headers.get(IDEMPOTENCY_HEADER)
+            if key is None:
+                return handler(view, request, *args, **kwargs)
+            if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+                return api_response(False, f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} printable characters.",
+                                    status_code=status.HTTP_400_BAD_REQUEST)
+
+            owner = request.user.pk if request.user and request.user.is_authenticated else 'anonymous'
+            cache_key = f"idempotency:{scope}:{owner}:{hashlib.sha256(key.encode()).hexdigest()}"
+            lock_key = cache_key + ':lock'
+            fingerprint = _fingerprint(request)
+            store = _cache()
+
+            stored = store.get(cache_key)
+            if stored is None:
+                if not store.add(lock_key, fingerprint, getattr(settings, 'IDEMPOTENCY_LOCK_TIMEOUT', 60)):
+                    return api_response(False, "A request with this Idempotency-Key is still being processed.",
+                                        status_code=status.HTTP_409_CONFLICT)
+                # The first request may have stored its response and released the lock
+                # between the get above and the add; replay it rather than running twice.
+                stored = store.get(cache_key)
+                if stored is not None:
+                    store.delete(lock_key)
+            if stored is None:
+                try:
+                    response = handler(view, request, *args, **kwargs)
+                    if response.status_code < 500 and isinstance(response, Response):
+                        headers = {name: value for name, value in response.items() if name == 'Location'}
+                        store.set(cache_key, (fingerprint, response.status_code, response.data, headers),
+                                  getattr(settings, 'IDEMPOTENCY_KEY_TTL', 24 * 60 * 60))
+                    return response
+                finally:
+                    store.delete(lock_key)
+
+            stored_fingerprint, status_code, data, headers = stored
+            if stored_fingerprint != fingerprint:
+                return api_response(False, f"This {IDEMPOTENCY_HEADER} was already used for a different request.",
+                                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            response = Response(data, status=status_code, headers=headers)
+            response[REPLAYED_HEADER] = 'true'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,238 @@
+"""
+Background jobs backed by the BackgroundJob table.
+
+Handlers are registered by name with ``@register_job('kind')`` and take the
+BackgroundJob row. ``enqueue_job`` records the job and hands it to a small
+in-process thread pool once the surrounding transaction commits; anything a
+restart leaves behind is picked up by ``manage.py run_jobs``.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, models, transaction
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def register_job(kind):
+    """Registers the decorated function as the handler for jobs of ``kind``."""
+    def decorator(func):
+        _registry[kind] = func
+        return func
+    return decorator
+
+
+def get_handler(kind):
+    return _registry.get(kind)
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_JOB_WORKERS', 2),
+                thread_name_prefix='background-job',
+            )
+        return _executor
+
+
+#MARK: Enqueue
+def enqueue_job(kind, payload=None, user=None):
+    """
+    Creates a pending job and starts it after the current transaction commits.
+    Returns the BackgroundJob row.
+    """
+    if kind not in _registry:
+        raise ValueError(f"No background job registered as '{kind}'.")
+    job = BackgroundJob.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    transaction.on_commit(partial(_submit, job.pk), robust=True)
+    return job
+
+
+def _submit(job_id):
+    get_executor().submit(_run_in_thread, job_id)
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+#MARK: Run
+def claim_job(job_id):
+    """Moves a pending job to running. Returns False if another worker got it first."""
+    return bool(
+        BackgroundJob.objects
+        .filter(pk=job_id, status=BackgroundJob.STATUS_PENDING)
+        .update(status=BackgroundJob.STATUS_RUNNING, started_at=timezone.now(), updated_at=timezone.now())
+    )
+
+
+def run_job(job_id):
+    """Claims and runs one job, recording the outcome. Returns the job, or None if it wasn't claimed."""
+    if not claim_job(job_id):
+        return None
+    job = BackgroundJob.objects.get(pk=job_id)
+    handler = get_handler(job.kind)
+    try:
+        if handler is None:
+            raise LookupError(f"No background job registered as '{job.kind}'.")
+        outcome = handler(job)
+    except Exception as exc:
+        logger.exception("Background job %s (%s) failed", job.pk, job.kind)
+        job.status = BackgroundJob.STATUS_FAILED
+        job.error = str(exc)
+    else:
+        job.status = BackgroundJob.STATUS_SUCCEEDED
+        if isinstance(outcome, dict):
+            job.result.update(outcome)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'result', 'processed_items', 'total_items', 'finished_at', 'updated_at'])
+    return job
+
+
+def requeue_stale_jobs(older_than):
+    """Puts jobs stuck in 'running' (their worker died) back to pending."""
+    cutoff = timezone.now() - older_than
+    return (
+        BackgroundJob.objects
+        .filter(status=BackgroundJob.STATUS_RUNNING, updated_at__lt=cutoff)
+        .update(status=BackgroundJob.STATUS_PENDING, updated_at=timezone.now())
+    )
+
+
+#MARK: Selections
+def pk_ranges(queryset):
+    """
+    Compresses the primary keys of ``queryset`` into sorted ``[first, last]``
+    runs, so a selection of thousands of rows fits in a job payload.
+    """
+    ranges = []
+    for pk in queryset.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=2000):
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ranges
+
+
+def count_pk_ranges(ranges):
+    return sum(last - first + 1 for first, last in ranges)
+
+
+def iter_pk_chunks(ranges, chunk_size):
+    """Yields lists of at most ``chunk_size`` primary keys from ``pk_ranges`` output."""
+    chunk = []
+    for first, last in ranges:
+        pk = first
+        while pk <= last:
+            take = min(last - pk + 1, chunk_size - len(chunk))
+            chunk.extend(range(pk, pk + take))
+            pk += take
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+#MARK: Account deletion
+def get_deletion_batch_size():
+    return getattr(settings, 'ACCOUNT_DELETION_BATCH_SIZE', 500)
+
+
+def _user_relations(User):
+    """
+    (model, lookup) pairs for every row that must go before the user does:
+    reverse cascading foreign keys and the user's own many-to-many rows.
+    """
+    relations = []
+    for rel in User._meta.related_objects:
+        if rel.many_to_many or rel.on_delete is not models.CASCADE:
+            continue
+        relations.append((rel.related_model, rel.field.name))
+    for field in User._meta.many_to_many:
+        through = field.remote_field.through
+        relations.append((through, field.m2m_field_name()))
+    return relations
+
+
+def schedule_user_deletion(user, requested_by=None):
+    """
+    Deactivates ``user`` right away and queues the purge of their data.
+    Returns the (possibly already queued) BackgroundJob.
+    """
+    existing = (
+        BackgroundJob.objects
+        .filter(kind='delete_user', payload__user_id=user.pk,
+                status__in=[BackgroundJob.STATUS_PENDING, BackgroundJob.STATUS_RUNNING])
+        .first()
+    )
+    if existing:
+        return existing
+    with transaction.atomic():
+        type(user).objects.filter(pk=user.pk).update(is_active=False)
+        user.is_active = False
+        return enqueue_job('delete_user', {'user_id': user.pk}, user=requested_by)
+
+
+@register_job('delete_user')
+def delete_user_account(job):
+    """
+    Purges a user's related rows in bounded batches (one short transaction
+    each), then deletes the user row itself. Files go through the
+    media_management post_delete cleanup as each batch commits.
+    """
+    User = get_user_model()
+    user_id = job.payload['user_id']
+    batch_size = get_deletion_batch_size()
+    if not User.objects.filter(pk=user_id).exists():
+        return {'user_deleted': False}
+
+    relations = _user_relations(User)
+    counts = {
+        model._meta.label: model._default_manager.filter(**{lookup: user_id}).count()
+        for model, lookup in relations
+    }
+    job.report_progress(processed=0, total=sum(counts.values()) + 1)
+
+    processed = 0
+    for model, lookup in relations:
+        label = model._meta.label
+        deleted = 0
+        while True:
+            pks = list(
+                model._default_manager.filter(**{lookup: user_id})
+                .order_by('pk').values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                model._default_manager.filter(pk__in=pks).delete()
+            deleted += len(pks)
+            processed += len(pks)
+            job.report_progress(processed=processed, **{label: deleted})
+
+    with transaction.atomic():
+        User.objects.filter(pk=user_id).delete()
+    job.report_progress(processed=processed + 1)
+    return {'user_deleted': True}
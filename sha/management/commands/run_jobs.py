@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from sha.jobs import requeue_stale_jobs, run_job
+from sha.models import BackgroundJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs pending background jobs in this process. Jobs are normally started by the web "
+        "process that queued them; schedule this to pick up anything a restart left behind."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', action='append',
+                            help="Only run jobs of this kind (repeatable).")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Stop after this many jobs.")
+        parser.add_argument('--stale-minutes', type=int, default=30,
+                            help="Re-queue 'running' jobs with no progress for this long (default: 30).")
+
+    def handle(self, *args, **options):
+        if options['limit'] is not None and options['limit'] < 1:
+            raise CommandError("--limit must be at least 1.")
+
+        requeued = requeue_stale_jobs(timedelta(minutes=options['stale_minutes']))
+        if requeued:
+            self.stdout.write(f"Re-queued {requeued} stale job(s).")
+
+        pending = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_PENDING).order_by('created_at')
+        if options['kind']:
+            pending = pending.filter(kind__in=options['kind'])
+
+        succeeded = failed = 0
+        for job_id in pending.values_list('pk', flat=True)[:options['limit']]:
+            job = run_job(job_id)
+            if job is None:
+                continue  # claimed by a web worker in the meantime
+            if job.status == BackgroundJob.STATUS_SUCCEEDED:
+                succeeded += 1
+            else:
+                failed += 1
+                self.stderr.write(f"Job {job.pk} ({job.kind}): {job.error}")
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {succeeded + failed} job(s): {succeeded} succeeded, {failed} failed."))
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-19 09:48
+
+import media_management.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sha', '0006_remove_user_branch_remove_user_ifsc_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='profile_picture',
+            field=models.ImageField(blank=True, null=True, upload_to=media_management.utils.ShardedUploadPath('profile_pictures')),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='proof_of_address_document',
+            field=models.FileField(blank=True, null=True, upload_to=media_management.utils.ShardedUploadPath('address_proofs')),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='proof_of_identity_document',
+            field=models.FileField(blank=True, null=True, upload_to=media_management.utils.ShardedUploadPath('identity_proofs')),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-19 10:01
+
+import media_management.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sha', '0010_user_directory_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='output',
+            field=models.FileField(blank=True, help_text='File produced by the job, e.g. an export.', null=True, upload_to=media_management.utils.ShardedUploadPath('job_output')),
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.utils import timezone
 from django.contrib.auth.base_user import BaseUserManager
 import pytz
 from django.db.models import JSONField # Import JSONField for MySQL compatibility
+from media_management.utils import ShardedUploadPath
 
 TIMEZONE_CHOICES = [(tz, tz) for tz in pytz.common_timezones]
 
@@ -94,7 +95,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     otp_created_at = models.DateTimeField(null=True, blank=True)
 
     # PROFILE FIELDS
-    profile_picture = models.ImageField(upload_to='profile_pictures/', null=True, blank=True)
+    profile_picture = models.ImageField(upload_to=ShardedUploadPath('profile_pictures'), null=True, blank=True)
     date_of_birth = models.DateField(null=True, blank=True)
     guardian_name = models.CharField(max_length=255, null=True, blank=True)
     address = models.TextField(null=True, blank=True)
@@ -108,9 +109,9 @@ class User(AbstractBaseUser, PermissionsMixin):
         ('other', 'Other Document')
     ]
     proof_of_identity_type = models.CharField(max_length=20, choices=PROOF_CHOICES, null=True, blank=True)
-    proof_of_identity_document = models.FileField(upload_to='identity_proofs/', null=True, blank=True)
+    proof_of_identity_document = models.FileField(upload_to=ShardedUploadPath('identity_proofs'), null=True, blank=True)
     proof_of_address_type = models.CharField(max_length=20, choices=PROOF_CHOICES, null=True, blank=True)
-    proof_of_address_document = models.FileField(upload_to='address_proofs/', null=True, blank=True)
+    proof_of_address_document = models.FileField(upload_to=ShardedUploadPath('address_proofs'), null=True, blank=True)
 
     GENDER_CHOICES = [
         ('male', 'Male'),
@@ -177,6 +178,15 @@ class User(AbstractBaseUser, PermissionsMixin):
     REQUIRED_FIELDS = ['name'] # <-- REQUIRED FOR `createsuperuser` if not nullable
                                #     If `name` can be entirely optional, this can be empty []
 
+    class Meta:
+        indexes = [
+            # Prefix search on display names (mobile_number and email are unique, so already indexed).
+            models.Index(fields=['name'], name='user_name_idx'),
+            # Staff directory: newest first, optionally narrowed to an occupation / active flag.
+            models.Index(fields=['occupation', 'is_active', 'date_joined'], name='user_directory_idx'),
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ]
+
     def is_otp_valid(self, otp_input, expiry_seconds=300):
         if self.otp is None or self.otp != otp_input or not self.otp_created_at:
             return False
@@ -197,3 +207,72 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def get_short_name(self):
         return self.name if self.name else self.mobile_number
+
+
+#MARK: Background Job Model
+class BackgroundJob(models.Model):
+    """
+    A unit of work run outside the request cycle (see sha.jobs).
+    Rows double as the status/progress record shown to users and in the admin.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50, help_text="Registered job handler name.")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    payload = JSONField(default=dict, blank=True)
+    result = JSONField(default=dict, blank=True, help_text="Per-step counters and the final outcome.")
+    processed_items = models.PositiveBigIntegerField(default=0)
+    total_items = models.PositiveBigIntegerField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    output = models.FileField(upload_to=ShardedUploadPath('job_output'), null=True, blank=True,
+                              help_text="File produced by the job, e.g. an export.")
+    created_by = models.ForeignKey(
+        'sha.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # run_jobs picks up work by status, oldest first.
+            models.Index(fields=['status', 'created_at'], name='backgroundjob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def progress(self):
+        """Completion as a percentage, or None while the total is unknown."""
+        if not self.total_items:
+            return None
+        return min(100, round(self.processed_items * 100 / self.total_items, 1))
+
+    def report_progress(self, processed=None, total=None, **counters):
+        """
+        Persists progress with a single UPDATE, without touching the other
+        columns, so a long job can call it after every batch.
+        """
+        if processed is not None:
+            self.processed_items = processed
+        if total is not None:
+            self.total_items = total
+        self.result.update(counters)
+        BackgroundJob.objects.filter(pk=self.pk).update(
+            processed_items=self.processed_items,
+            total_items=self.total_items,
+            result=self.result,
+            updated_at=timezone.now(),
+        )
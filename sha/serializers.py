@@ -3,7 +3,9 @@ from rest_framework import serializers
 import phonenumbers
 from django.contrib.auth import get_user_model
 from django.conf import settings
-from .models import UserProfileSettings
+from .models import UserProfileSettings, BackgroundJob
+from media_management.tasks import schedule_profile_picture_normalization
+from media_management.serializers import SignedFileField, SignedImageField
 
 User = get_user_model()
 
@@ -126,9 +128,10 @@ class UserProfileSerializer(serializers.ModelSerializer):
     Also used for retrieving user profile data.
     Dynamically limits editable fields for non-admin users based on UserProfileSettings.
     """
-    profile_picture = serializers.ImageField(required=False, allow_null=True)
-    proof_of_identity_document = serializers.FileField(required=False, allow_null=True)
-    proof_of_address_document = serializers.FileField(required=False, allow_null=True)
+    # Rendered as expiring signed URLs, so clients can fetch the files without an auth round trip
+    profile_picture = SignedImageField(required=False, allow_null=True)
+    proof_of_identity_document = SignedFileField(required=False, allow_null=True)
+    proof_of_address_document = SignedFileField(required=False, allow_null=True)
 
     class Meta:
         model = User
@@ -213,6 +216,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
+        if validated_data.get('profile_picture'):
+            schedule_profile_picture_normalization(instance)
         return instance
 
     def update(self, instance, validated_data):
@@ -220,5 +225,54 @@ class UserProfileSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
+        if validated_data.get('profile_picture'):
+            # Re-encoded off-request; the response still shows the original until it lands.
+            schedule_profile_picture_normalization(instance)
         return instance
 
+
+
+# Columns of the staff CSV export (UserExportView and the UserAdmin action).
+USER_EXPORT_FIELDS = [
+    'id', 'mobile_number', 'name', 'email', 'occupation', 'gender', 'date_of_birth',
+    'city', 'pincode', 'is_active', 'date_joined',
+]
+
+
+#MARK: User Directory Serializer
+class UserDirectorySerializer(serializers.ModelSerializer):
+    """
+    Compact user representation for the staff directory.
+    Pass ``fields`` (an iterable of names) to return only those fields.
+    """
+    profile_picture = SignedImageField(read_only=True)
+
+    class Meta:
+        model = User
+        fields = [
+            'id', 'mobile_number', 'name', 'email', 'occupation', 'city',
+            'profile_picture', 'is_active', 'is_staff', 'date_joined',
+        ]
+        read_only_fields = fields
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+#MARK: Background Job Serializer
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    """
+    Read-only status of a background job: where it stands and how far along it is.
+    """
+    progress = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            'id', 'kind', 'status', 'processed_items', 'total_items', 'progress',
+            'result', 'error', 'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = fields
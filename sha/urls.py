@@ -7,7 +7,9 @@ urlpatterns = [
     path('verify-otp/', views.VerifyOTP.as_view(), name='verify_otp'),
     path('profile/<int:pk>/', views.AdminUserProfileView.as_view(), name='user-profile-admin'),
     path('profile/', views.UserProfileView.as_view(), name='user_profile'),
-    path('profile/list/', views.UserProfileView.as_view(), name='user_profile_list'),
+    path('profile/list/', views.UserDirectoryView.as_view(), name='user_profile_list'),
+    path('profile/export/', views.UserExportView.as_view(), name='user_profile_export'),
     path('profile/edit/', views.UserProfileView.as_view(), name='user_profile_edit'),
+    path('jobs/<int:pk>/', views.BackgroundJobStatusView.as_view(), name='background_job_status'),
 ]
     
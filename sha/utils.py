@@ -1,9 +1,16 @@
 # SHA_GROUP/sha/utils.py
+import csv
+import io
 import random
+import re
 import phonenumbers
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.response import Response
+from django.db import connections, router
+from django.http import StreamingHttpResponse
 from rest_framework import status
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.views import exception_handler
 from rest_framework.exceptions import ValidationError, NotAuthenticated, PermissionDenied, NotFound
 
@@ -178,3 +185,100 @@ def custom_exception_handler(exc, context):
     # For now, we'll just return None, letting Django handle it.
     return None
 
+
+#MARK: Bulk upsert
+def bulk_upsert(model, objs, unique_fields, update_fields):
+    """
+    ``bulk_create(update_conflicts=True)`` on every backend. MySQL can't name
+    the conflicting columns (its ON DUPLICATE KEY UPDATE fires on any unique
+    key) and Django refuses ``unique_fields`` there, so they are only passed
+    where the backend supports a conflict target.
+    """
+    options = {'update_conflicts': True, 'update_fields': update_fields}
+    if connections[router.db_for_write(model)].features.supports_update_conflicts_with_target:
+        options['unique_fields'] = unique_fields
+    return model._default_manager.bulk_create(objs, **options)
+
+
+#MARK: Streaming CSV
+CSV_FLUSH_SIZE = 64 * 1024
+
+
+def iter_values_list(queryset, fields, chunk_size=2000):
+    """
+    Yields ``values_list(*fields)`` tuples for ``queryset`` in primary key
+    order, ``chunk_size`` rows per query. Each query resumes after the last
+    key seen, so memory stays flat even where the database driver buffers
+    whole result sets (MySQLdb does, so a bare .iterator() would not).
+    """
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(batch.values_list('pk', *fields)[:chunk_size])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        for row in rows:
+            yield row[1:]
+
+
+# Spreadsheets evaluate cells starting with these as formulas.
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+# Phone numbers (+971...) and signed numbers are data, not formulas; quoting them would corrupt the export.
+CSV_PLAIN_NUMBER_RE = re.compile(r'[+-]?\d+(?:\.\d+)?')
+
+
+def csv_safe_row(row):
+    """``row`` with text cells that a spreadsheet would run as a formula prefixed by a quote."""
+    return [
+        f"'{value}" if (
+            isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES) and not CSV_PLAIN_NUMBER_RE.fullmatch(value)
+        ) else value
+        for value in row
+    ]
+
+
+class CSVContentNegotiation(DefaultContentNegotiation):
+    """
+    Negotiation for views that answer with a streamed CSV file. The file
+    isn't rendered by a DRF renderer, so ``Accept: text/csv`` would otherwise
+    be refused with a 406; unmatched Accept headers fall back to the first
+    renderer, which is only used for error responses.
+    """
+    def select_renderer(self, request, renderers, format_suffix=None):
+        try:
+            return super().select_renderer(request, renderers, format_suffix)
+        except NotAcceptable:
+            return renderers[0], renderers[0].media_type
+
+
+def _drain(buffer):
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+def streaming_csv_response(filename, header, rows):
+    """
+    StreamingHttpResponse that sends ``header`` at once, then ``rows`` (any
+    iterable of sequences) in ~64 KB pieces as they are produced. Text cells
+    go through csv_safe_row.
+    """
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        # The header goes out on its own so the download starts before the first query runs.
+        yield _drain(buffer)
+        for row in rows:
+            writer.writerow(csv_safe_row(row))
+            if buffer.tell() >= CSV_FLUSH_SIZE:
+                yield _drain(buffer)
+        if buffer.tell():
+            yield _drain(buffer)
+
+    response = StreamingHttpResponse(generate(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
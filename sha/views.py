@@ -6,12 +6,18 @@ from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser #
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from rest_framework import generics # For ListAPIView
-from .utils import generate_otp, get_tokens_for_user, api_response
+from .utils import generate_otp, get_tokens_for_user, api_response, iter_values_list, streaming_csv_response, CSVContentNegotiation
+from .jobs import schedule_user_deletion
+from .idempotency import idempotent
 from .serializers import (
     SendOTPRequestSerializer, VerifyOTPRequestSerializer,
-    UserSerializer, UserProfileSerializer
+    UserSerializer, UserProfileSerializer, BackgroundJobSerializer, UserDirectorySerializer,
+    USER_EXPORT_FIELDS,
 )
+from .filters import UserDirectoryFilterBackend, UserDirectoryPagination
+from .models import BackgroundJob
 from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError as DRFValidationError
 
 User = get_user_model()
 #MARK: Request OTP
@@ -24,6 +30,7 @@ class RequestPhoneOTP(APIView):
     permission_classes = [AllowAny]
     authentication_classes = [] # Explicitly disable authentication
 
+    @idempotent('sha.request_otp')
     def post(self, request):
         serializer = SendOTPRequestSerializer(data=request.data)
         if not serializer.is_valid():
@@ -225,16 +232,79 @@ class UserProfileView(APIView):
                 return api_response(False, "You do not have permission to delete other users' profiles.", status_code=status.HTTP_403_FORBIDDEN)
             # If user_to_delete.pk == request.user.pk, it's their own profile, so proceed.
 
-        # If all checks pass, perform the deletion
+        # If all checks pass, deactivate now and purge the account in the background
         try:
             mobile_number_deleted = getattr(user_to_delete, 'mobile_number', 'N/A')
-            user_to_delete.delete()
-            return api_response(True, f"User '{mobile_number_deleted}' and associated profile deleted successfully.", status_code=status.HTTP_204_NO_CONTENT)
+            job = schedule_user_deletion(user_to_delete, requested_by=request.user)
+            # A user deleting themselves is logged out by the deactivation and can't
+            # follow the job, so only staff get its id (see BackgroundJobStatusView).
+            data = {"job_id": job.pk, "status": job.status} if request.user.is_staff else None
+            return api_response(
+                True,
+                f"User '{mobile_number_deleted}' has been deactivated and is scheduled for deletion.",
+                data=data,
+                status_code=status.HTTP_202_ACCEPTED,
+            )
         except Exception as e:
             # Catch any unexpected errors during the deletion process
             # It's highly recommended to log these errors for debugging.
             return api_response(False, f"An internal server error occurred while deleting the user: {str(e)}", status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+#MARK: User Directory
+class UserDirectoryView(generics.ListAPIView):
+    """
+    Staff-only, paginated list of users with prefix search (see sha.filters).
+    ``?fields=id,name,mobile_number`` limits both the response and the columns loaded.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    serializer_class = UserDirectorySerializer
+    filter_backends = [UserDirectoryFilterBackend]
+    pagination_class = UserDirectoryPagination
+
+    def get_fields(self):
+        requested = self.request.query_params.get('fields')
+        if not requested:
+            return None
+        allowed = UserDirectorySerializer.Meta.fields
+        fields = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in fields if name not in allowed]
+        if unknown or not fields:
+            raise DRFValidationError({'fields': [f"Choose from: {', '.join(allowed)}."]})
+        return fields
+
+    def get_queryset(self):
+        queryset = User.objects.order_by('-date_joined', '-pk')
+        fields = self.get_fields()
+        if fields:
+            queryset = queryset.only(*fields)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return api_response(True, "Users listed successfully.", data=self.get_paginated_response(serializer.data).data)
+
+#MARK: User Export
+class UserExportView(APIView):
+    """
+    Streams the user directory as CSV (staff only), with the same filters as
+    the directory list. Rows are read in primary key batches.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+    content_negotiation_class = CSVContentNegotiation
+    fields = USER_EXPORT_FIELDS
+
+    def get(self, request, *args, **kwargs):
+        queryset = UserDirectoryFilterBackend().filter_queryset(request, User.objects.all(), self)
+        return streaming_csv_response(
+            f"users-{timezone.localdate():%Y%m%d}.csv", self.fields, iter_values_list(queryset, self.fields),
+        )
+
 #MARK: Admin User Profile
 class AdminUserProfileView(APIView):
     """
@@ -284,4 +354,20 @@ class AdminUserProfileView(APIView):
     # If an admin needs to *create* a user and their initial profile, that would typically be a separate
     # user creation endpoint.
 
-    
\ No newline at end of file
+    
+
+
+#MARK: Background Job Status
+class BackgroundJobStatusView(APIView):
+    """
+    Progress of a background job (e.g. an account deletion). Staff only: the
+    jobs are started by staff, and a user deleting their own account is
+    deactivated straight away, so they couldn't poll it anyway.
+    """
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    def get(self, request, pk, *args, **kwargs):
+        job = BackgroundJob.objects.filter(pk=pk).first()
+        if not job:
+            return api_response(False, "Job not found.", status_code=status.HTTP_404_NOT_FOUND)
+        return api_response(True, "Job status retrieved successfully.", data=BackgroundJobSerializer(job).data)